@@ -0,0 +1,232 @@
+"""Headless benchmarks for the BGMI table editor. No display needed.
+
+Usage: python bench.py [save] [load] [suite] [--sizes 25,1000,100000] [--repeat 5] [--json PATH]
+
+save:  auto-save latency (render + write of BGMI.html) of the string
+       renderer against the previous BeautifulSoup new_tag/prettify path.
+load:  startup load time of the previous bs4 parse of the whole page, the
+       fast tbody-only parse, and a sidecar-cache hit.
+suite: a synthetic tournament per size: load (a full parse, and a
+       sidecar-cache hit, timed separately), then bursts of status
+       toggles with debounced saves through the real background writer.
+       Also times building the view/search indexes, team searches and
+       jump-to-team selections of the virtualized Treeview (minus Tk).
+       Reports p50/p95/p99/max per operation; --json writes them to a file
+       so runs can be compared before match day.
+
+The bs4 columns are skipped if beautifulsoup4 is not installed. Treeview
+refresh needs a display and is measured in the editor itself (--stats).
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from loader import load_file, parse_bs4
+from metrics import Metrics, metrics as writer_metrics
+from render import DEFAULT_HTML, OverlayRenderer
+from standings import Standings, ALL_ALIVE, NUM_STATUS_INDICATORS, toggle_indicator
+from view import OrderedView, SearchIndex
+from writer import OverlayWriter
+
+HTML_FILE = "BGMI.html"
+
+
+def synthetic_standings(num_teams, seed=0):
+    """Builds a store with num_teams random teams."""
+    rng = random.Random(seed)
+    store = Standings()
+    for rank in range(1, num_teams + 1):
+        store.add(rank, f"Team {rank:06d}", rng.randint(0, 200), rng.randint(0, ALL_ALIVE))
+    return store
+
+
+def load_template():
+    if os.path.exists(HTML_FILE):
+        with open(HTML_FILE, "r", encoding="utf-8") as file:
+            return file.read()
+    return DEFAULT_HTML
+
+
+def bs4_save(template_html, rows, path):
+    """The editor's previous save path: rebuild <tbody> with new_tag, then prettify()."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(template_html, "html.parser")
+    tbody = soup.find("table").find("tbody")
+    tbody.clear()
+    for row_values in rows:
+        new_row = soup.new_tag("tr")
+        for i, cell_value in enumerate(row_values):
+            new_td = soup.new_tag("td")
+            if i == 3:
+                cell_value = str(cell_value).replace("✅", "🟩").replace("❌", "🟥")
+            new_td.string = str(cell_value)
+            new_row.append(new_td)
+        tbody.append(new_row)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(soup.prettify())
+
+
+def renderer_save(renderer, store, path):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(renderer.render(store.ordered("#")))
+
+
+def time_call(func, repeat):
+    """Returns (median, best) wall time in milliseconds over `repeat` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def have_bs4():
+    try:
+        import bs4  # noqa: F401
+        return True
+    except ImportError:
+        print("beautifulsoup4 not installed; skipping the bs4 baseline.")
+        return False
+
+
+def bench_save(sizes, repeat):
+    with_bs4 = have_bs4()
+    template_html = load_template()
+    renderer = OverlayRenderer(template_html)
+    print(f"{'rows':>8}  {'renderer ms':>12}  {'bs4 ms':>10}  {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, HTML_FILE)
+        for size in sizes:
+            store = synthetic_standings(size)
+            fast, _ = time_call(lambda: renderer_save(renderer, store, path), repeat)
+            if with_bs4:
+                rows = store.rows()
+                # The bs4 path takes minutes at 100k rows; one sample is enough there.
+                slow, _ = time_call(lambda: bs4_save(template_html, rows, path), repeat if size <= 1000 else 1)
+                print(f"{size:>8}  {fast:>12.2f}  {slow:>10.2f}  {slow / fast:>7.1f}x")
+            else:
+                print(f"{size:>8}  {fast:>12.2f}  {'-':>10}  {'-':>8}")
+
+
+def bench_load(sizes, repeat):
+    with_bs4 = have_bs4()
+    renderer = OverlayRenderer(load_template())
+    print(f"{'rows':>8}  {'bs4 ms':>10}  {'fast ms':>10}  {'cached ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, HTML_FILE)
+        cache_path = path + ".cache.json"
+        for size in sizes:
+            renderer_save(renderer, synthetic_standings(size), path)
+
+            def uncached():
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+                load_file(path, cache_path)
+
+            fast, _ = time_call(uncached, repeat)
+            load_file(path, cache_path) # Warm the cache
+            cached, _ = time_call(lambda: load_file(path, cache_path), repeat)
+            if with_bs4:
+                def old_load():
+                    with open(path, "r", encoding="utf-8") as file:
+                        parse_bs4(file.read(), path)
+                slow, _ = time_call(old_load, repeat if size <= 1000 else 1)
+                print(f"{size:>8}  {slow:>10.2f}  {fast:>10.2f}  {cached:>10.2f}")
+            else:
+                print(f"{size:>8}  {'-':>10}  {fast:>10.2f}  {cached:>10.2f}")
+
+
+SUITE_BURSTS = 50 # Bursts of toggles per tournament
+SUITE_BURST_SIZE = 16 # Toggles per burst (a fight wiping a few squads), then one save
+SUITE_LOOKUPS = 200 # Team searches and jump-to-team selections per tournament
+SUITE_VISIBLE_ROWS = 25 # Rows the editor's Treeview shows at once
+SUITE_OPERATIONS = ("parse", "cache_hit", "index", "search", "select", "toggle", "save", "save_to_disk", "render", "write")
+
+
+def bench_suite(sizes, repeat):
+    """Runs the synthetic tournament for each size. Returns {size: {operation: stats}}."""
+    rng = random.Random(1)
+    renderer = OverlayRenderer(load_template())
+    results = {}
+    print(f"{'teams':>8}  {'operation':<12}  {'calls':>6}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'max ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"{size}.html")
+            renderer_save(renderer, synthetic_standings(size), path)
+            timings = Metrics()
+            cache_path = path + ".cache.json"
+            for _ in range(repeat):
+                if os.path.exists(cache_path):
+                    os.remove(cache_path) # Every parse sample parses; only cache_hit reads the cache
+                with timings.timer("parse"):
+                    load_file(path, cache_path)
+                with timings.timer("cache_hit"):
+                    store = load_file(path, cache_path).store
+
+            ranks = [team.rank for team in store]
+            with timings.timer("index"):
+                view, index = OrderedView(store, "Points", True), SearchIndex(store)
+            for lookup in range(SUITE_LOOKUPS):
+                team = store.get(rng.choice(ranks))
+                with timings.timer("search"): # Alternate prefix and substring searches
+                    index.search(team.name[:8] if lookup % 2 else team.name[-4:])
+                with timings.timer("select"):
+                    view.window(view.position(team.rank), SUITE_VISIBLE_ROWS)
+
+            writer = OverlayWriter(path)
+            for _ in range(SUITE_BURSTS):
+                for _ in range(SUITE_BURST_SIZE):
+                    team = store.get(rng.choice(ranks))
+                    with timings.timer("toggle"):
+                        store.update(team.rank, status=toggle_indicator(team.status, rng.randrange(NUM_STATUS_INDICATORS)))
+                with timings.timer("save"): # The part the Tk thread waits for
+                    writer.save(renderer, store)
+                start = time.perf_counter()
+                writer.flush()
+                timings.record("save_to_disk", time.perf_counter() - start)
+            writer.close()
+
+            # render/write happen on the writer thread and go to the shared metrics
+            results[size] = {operation: (writer_metrics if operation in ("render", "write") else timings).stats(operation)
+                             for operation in SUITE_OPERATIONS}
+            writer_metrics.reset()
+            for operation, stats in results[size].items():
+                print(f"{size:>8}  {operation:<12}  {stats['calls']:>6}  {stats['p50_ms']:>8.3f}  {stats['p95_ms']:>8.3f}"
+                      f"  {stats['p99_ms']:>8.3f}  {stats['max_ms']:>8.3f}")
+    return results
+
+
+BENCHMARKS = {"save": bench_save, "load": bench_load, "suite": bench_suite}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help=f"which benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--sizes", default="25,1000,100000", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per measurement")
+    parser.add_argument("--json", metavar="PATH", help="write the suite's per-operation percentiles to PATH")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    suite_results = None
+    for name in args.benchmarks or BENCHMARKS:
+        print(f"--- {name} ---")
+        result = BENCHMARKS[name](sizes, args.repeat)
+        if name == "suite":
+            suite_results = result
+    if args.json and suite_results:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({str(size): stats for size, stats in suite_results.items()}, file, indent=2)
+        print(f"Suite results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,230 +1,636 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-from bs4 import BeautifulSoup
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import argparse
+import json
 import os
-import shutil
-
-HTML_FILE = "BGMI.html"
-BACKUP_FILE = "BGMI.html.bak"
-NUM_STATUS_INDICATORS = 4
+import queue
+import time
+from contextlib import contextmanager
+from standings import Standings, StandingsError, COLUMNS, NUM_STATUS_INDICATORS, mask_to_status, toggle_indicator
+from render import OverlayRenderer
+from writer import write_atomic
+from loader import LoadError, file_key, load_file, write_cache
+from journal import JournalError
+from lobbies import DEFAULT_LOBBY, OVERALL_FILE, LobbySet, parse_lobby_arg
+from watch import ExternalEditWatcher, edits_since_last_write
+from bulk import parse_import, parse_match_results, read_import_file
+from metrics import metrics
+from view import OrderedView, SearchIndex, SEARCH_LIMIT
+from undo import UndoHistory, describe
+
+HTML_FILE = "BGMI.html" # Overlay of the default lobby; --lobby adds others (see lobbies.py for their files)
 AUTO_SAVE_DELAY_MS = 2000 # Delay in milliseconds (e.g., 2000 = 2 seconds)
-
-data = []
-soup = None
-auto_save_job = None # Variable to store the pending .after job ID
+RAPID_SAVE_DELAY_MS = 250 # Rapid entry: save this long after the last keypress...
+RAPID_MAX_SAVE_WAIT_MS = 1000 # ...but never hold rapid edits back from the file longer than this
+SAVE_POLL_INTERVAL_MS = 100 # How often the Tk thread checks for finished background saves
+DEFAULT_SERVER_PORT = 8765 # Same as server.DEFAULT_PORT; server.py (asyncio) is only imported with --serve
+DEFAULT_SHARING_PORT = 8766 # Same as sharing.DEFAULT_PORT; sharing.py (asyncio) is only imported with --host/--join
+SHARING_POLL_INTERVAL_MS = 20 # How often other operators' edits are applied (--host/--join)
+WATCH_POLL_INTERVAL_MS = 500 # How often overlay files are checked for outside edits (--watch)
+MAX_WARNINGS_SHOWN = 20
+STATS_REFRESH_MS = 1000 # How often the optional stats line (--stats) is refreshed
+ROW_HEIGHT = 22 # Treeview row height in pixels; the visible row count is derived from it
+HEADER_HEIGHT = 26 # Approximate height of the Treeview's heading row
+WHEEL_ROWS = 3 # Rows scrolled per mouse wheel notch
+RAPID_HELP = "Rapid entry: ↑/↓ select team, 1-4 toggle player, 0 team eliminated, Ctrl+F find, Ctrl+G go to #, Esc back, F2 off."
+
+lobby_set = None # Every lobby's files and background writers (lobbies.LobbySet), from --lobby
+lobby = None # The lobby shown in the editor; the globals below are its own
+store = Standings() # All team data lives here; the Treeview only mirrors it
+renderer = None # Cached prefix/suffix of the lobby's overlay file around the table body
+writer = None # Renders and writes saves off the Tk thread
+journal = None # Every edit is appended here; replayed on startup instead of parsing the overlay
+push_server = None # Optional live overlay server (--serve)
+sharing = None # SharingHost (--host) or SharingClient (--join); row edits then go through it
+selected_version = 0 # Version of the selected row when it was selected, for conflict checks
 sort_column_cache = {"column": "#", "reverse": False} # Default sort column is now '#'
+# The Treeview only holds the rows on screen: a fixed set of items re-filled from order_view
+order_view = None # Teams in display order (view.OrderedView)
+search_index = None # Team-name prefix/substring index (view.SearchIndex)
+view_top = 0 # Display position of the first visible row
+visible_ranks = [] # # of the team shown in each Treeview item, top to bottom
+selected_rank = None # The selected team's #; it may be scrolled out of view
+search_state = {"query": None, "matches": [], "cursor": -1} # Enter steps through the matches
+failed_listeners = set() # Store listeners whose failure has already been shown in a dialog
+dialog_seconds = 0.0 # Time modal dialogs were open, left out of the startup "load" timing
 
 # --- Utility Functions (handle_load_error, load_data, update_table) ---
 # (Keep handle_load_error as before)
+@contextmanager
+def waiting_for_user():
+    """Counts the time a modal dialog opened in this block stays open in dialog_seconds."""
+    global dialog_seconds
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        dialog_seconds += time.perf_counter() - started
+
+@contextmanager
+def timer_without_dialogs(name):
+    """Like metrics.timer(name), minus the time the user spends on dialogs inside the block."""
+    started, waited = time.perf_counter(), dialog_seconds
+    yield
+    metrics.record(name, time.perf_counter() - started - (dialog_seconds - waited))
+
 def handle_load_error(message):
     """Handles errors during data loading."""
-    messagebox.showerror("Load Error", message)
+    with waiting_for_user():
+        messagebox.showerror("Load Error", message)
     # Return default empty data and basic HTML structure
-    return [], BeautifulSoup("<html><head><title>Standings</title></head><body><table><thead><tr><th>#</th><th>Team</th><th>Points</th><th>Status</th></tr></thead><tbody></tbody></table></body></html>", "html.parser")
-
-def load_data():
-    """Loads data from the HTML file with error handling."""
-    global soup, status_label
+    return Standings(), OverlayRenderer()
+
+def report_listener_error(name, error):
+    """A store listener (journal, timeline, push server...) failed on an edit. The edit itself was made."""
+    print(f"Warning: {name} failed on a standings change: {error}")
+    if name not in failed_listeners: # One dialog per listener, not one per edit
+        failed_listeners.add(name)
+        with waiting_for_user():
+            messagebox.showerror("Edit Not Fully Recorded",
+                                 f"The edit was made, but {name} failed on it:\n{error}\n\n"
+                                 "If this is the journal (e.g. the disk is full), edits may not survive a crash until it is fixed.")
+
+def recover_from_journal(lobby):
+    """Rebuilds the lobby's store from its journal, merging in edits made to its overlay file while the editor was closed."""
+    loaded_data = lobby.journal.recover()
+    show_load_warnings(lobby.journal.warnings, "Journal Warning")
     try:
-        if not os.path.exists(HTML_FILE):
-            default_data, default_soup = handle_load_error(f"Error: {HTML_FILE} not found. Created default empty structure.")
-            soup = default_soup
-            status_label.config(text=f"Error: {HTML_FILE} not found. Using empty table.", fg="orange")
-            return default_data, soup
-
-        with open(HTML_FILE, "r", encoding="utf-8") as file:
-            soup = BeautifulSoup(file, "html.parser")
-
-        table = soup.find("table")
-        if not table:
-             default_data, default_soup = handle_load_error(f"Error: No <table> tag found in {HTML_FILE}.")
-             soup = default_soup
-             status_label.config(text=f"Error: No <table> tag found in {HTML_FILE}. Using empty table.", fg="red")
-             return default_data, soup
-
-        header = table.find('thead') or table
-        header_cols = header.find_all("th") if header else []
-        # Check if first header is '#' or 'Rank' for backward compatibility maybe? For now, expect '#'
-        if len(header_cols) < 4 or header_cols[0].text.strip() not in ("#", "Rank"):
-             default_data, default_soup = handle_load_error(f"Error: Expected table headers '#', 'Team', 'Points', 'Status'. Found incomplete/wrong headers.")
-             soup = default_soup
-             status_label.config(text=f"Error: Table header columns incorrect in {HTML_FILE}. Using empty table.", fg="red")
-             return default_data, soup
-
-        loaded_data = []
-        data_rows = table.find('tbody') or table
-        tbody_rows = data_rows.find_all("tr")
-        # Adjust loop if header row is inside tbody without thead
-        start_index = 1 if table.find('thead') else (1 if tbody_rows and tbody_rows[0].find('th') else 0)
-
-        for i, row in enumerate(tbody_rows[start_index:], start=1):
-            if not row.find("td"): continue
-
-            cols = row.find_all("td")
-            if len(cols) < 4:
-                messagebox.showwarning("Load Warning", f"Row {i} in {HTML_FILE} has less than 4 columns (<td>). Skipping.")
-                continue
-
-            try:
-                rank_num = int(cols[0].text.strip()) # Internally still rank number
-                team = cols[1].text.strip()
-                points = int(cols[2].text.strip())
-                status = cols[3].text.strip().replace("🟩", "✅").replace("🟥", "❌")
-                if len(status) != NUM_STATUS_INDICATORS:
-                     messagebox.showwarning("Load Warning", f"Row {i} (# {rank_num}) has status length {len(status)}, expected {NUM_STATUS_INDICATORS}. Adjusting.")
-                     status = (status + "❌" * NUM_STATUS_INDICATORS)[:NUM_STATUS_INDICATORS]
-
-                loaded_data.append([rank_num, team, points, status]) # Data structure: [rank_num, team, points, status]
-            except ValueError:
-                 messagebox.showwarning("Load Warning", f"Row {i} in {HTML_FILE} has non-numeric # or Points. Skipping.")
-                 continue
-            except IndexError:
-                 messagebox.showwarning("Load Warning", f"Row {i} in {HTML_FILE} structure issue (IndexError). Skipping.")
-                 continue
-
-        status_label.config(text="Data loaded successfully.", fg="blue")
-        return loaded_data, soup
-
+        edit = edits_since_last_write(lobby.path, lobby.cache_path, loaded_data)
+    except (OSError, UnicodeDecodeError, LoadError) as e:
+        with waiting_for_user():
+            messagebox.showwarning("Outside Edit Warning", f"Could not check {lobby.path} for edits made while the editor was closed:\n{e}")
+        edit = None
+    if edit is None:
+        try:
+            loaded_renderer = OverlayRenderer.from_file(lobby.path)
+        except (OSError, UnicodeDecodeError):
+            loaded_renderer = OverlayRenderer()
+        status_label.config(text=f"Recovered {len(loaded_data)} teams from {lobby.journal.path}.", fg="blue")
+        return loaded_data, loaded_renderer
+    show_load_warnings(edit.warnings)
+    rows, deletes, use_file = resolve_outside_edit(
+        edit.merge, f"{lobby.path} was changed while the editor was closed", "have edits in the journal that the file does not")
+    try:
+        changed = loaded_data.apply_batch(rows, deletes) # Before the journal is attached: it records the merged table
+    except StandingsError as e:
+        with waiting_for_user():
+            messagebox.showerror("Outside Edit Error", f"Could not merge the edits made to {lobby.path}:\n{e}")
+        changed = 0
+    if {team.rank: team.freeze() for team in loaded_data} != edit.rows:
+        schedule_save(target_lobby=lobby) # The file lacks some of the editor's edits
+    kept = f", kept {len(edit.merge.conflicts)} journaled edit(s)" if edit.merge.conflicts and not use_file else ""
+    status_label.config(text=f"Recovered {len(loaded_data)} teams from {lobby.journal.path} and merged "
+                             f"{changed} team(s) edited in {lobby.path}{kept}.", fg="blue")
+    return loaded_data, OverlayRenderer(edit.html_text)
+
+def show_load_warnings(warnings, title="Load Warning"):
+    """Shows every load warning in a single dialog instead of one dialog per row."""
+    if not warnings:
+        return
+    shown = "\n".join(warnings[:MAX_WARNINGS_SHOWN])
+    if len(warnings) > MAX_WARNINGS_SHOWN:
+        shown += f"\n...and {len(warnings) - MAX_WARNINGS_SHOWN} more."
+    with waiting_for_user():
+        messagebox.showwarning(title, f"{len(warnings)} problem(s) while loading:\n{shown}")
+
+def load_data(lobby):
+    """Loads a lobby from its journal, or else its HTML file, with error handling. Returns (store, renderer)."""
+    global status_label
+    html_file = lobby.path
+    if lobby.journal.exists():
+        try:
+            return recover_from_journal(lobby)
+        except JournalError as e:
+            with waiting_for_user():
+                messagebox.showerror("Journal Error", f"{e}\nLoading {html_file} instead.")
+    try:
+        if not os.path.exists(html_file):
+            default_data, default_renderer = handle_load_error(f"Error: {html_file} not found. Created default empty structure.")
+            status_label.config(text=f"Error: {html_file} not found. Using empty table.", fg="orange")
+            return default_data, default_renderer
+
+        result = load_file(html_file, lobby.cache_path)
+        show_load_warnings(result.warnings)
+        status_label.config(text=f"Data loaded successfully ({len(result.store)} teams, {result.source}).", fg="blue")
+        return result.store, OverlayRenderer(result.html_text)
+
+    except LoadError as e:
+        default_data, default_renderer = handle_load_error(f"Error: {e}")
+        status_label.config(text=f"Error: table in {html_file} unusable. Using empty table.", fg="red")
+        return default_data, default_renderer
     except FileNotFoundError:
-        default_data, default_soup = handle_load_error(f"Error: {HTML_FILE} not found.")
-        soup = default_soup
-        status_label.config(text=f"Error: {HTML_FILE} not found. Using empty table.", fg="red")
-        return default_data, soup
+        default_data, default_renderer = handle_load_error(f"Error: {html_file} not found.")
+        status_label.config(text=f"Error: {html_file} not found. Using empty table.", fg="red")
+        return default_data, default_renderer
     except Exception as e:
-        default_data, default_soup = handle_load_error(f"An unexpected error occurred during loading: {e}")
-        soup = default_soup
+        default_data, default_renderer = handle_load_error(f"An unexpected error occurred during loading: {e}")
         status_label.config(text=f"Unexpected load error: {e}. Using empty table.", fg="red")
-        return default_data, soup
+        return default_data, default_renderer
+
+def show_lobby(name):
+    """Shows lobby `name` in the editor. The other lobbies keep their data and keep saving."""
+    global lobby, store, renderer, writer, journal, order_view, search_index, view_top
+    lobby = lobby_set[name]
+    store, renderer, writer, journal = lobby.store, lobby.renderer, lobby.writer, lobby.journal
+    if lobby.order_view is None:
+        lobby.order_view = OrderedView(store)
+        lobby.search_index = SearchIndex(store)
+    order_view, search_index = lobby.order_view, lobby.search_index
+    order_view.set_sort(sort_column_cache["column"], sort_column_cache["reverse"])
+    view_top = 0
+    search_state.update(query=None, matches=[], cursor=-1)
+    clear_entry_fields()
+    update_table()
 
-def update_table():
-    """Clears and repopulates the Treeview."""
-    for row in tree.get_children():
-        tree.delete(row)
-    for row_data in data:
-        tree.insert("", "end", values=row_data)
+def slot_id(index):
+    """Treeview item ID for the index-th visible row. Items are reused as the view scrolls."""
+    return f"row{index}"
 
-# --- Auto Save Logic ---
-def perform_save():
-    """The actual save function, separated for clarity."""
-    global data, soup, status_label
-    if not soup:
-        status_label.config(text="HTML structure missing, cannot save.", fg="red")
-        return
+def visible_row_count():
+    """How many rows fit in the Treeview at its current size (at least 1)."""
+    return max(1, (tree.winfo_height() - HEADER_HEIGHT) // ROW_HEIGHT)
 
-    status_label.config(text="Auto-saving...", fg="orange") # Indicate saving started
-    root.update_idletasks() # Ensure message updates
+def update_table():
+    """Re-fills the visible rows of the Treeview from the store in the current sort order.
+
+    Only the rows on screen exist as Treeview items, so this costs the same
+    for 25 teams as for 50,000.
+    """
+    with metrics.timer("view_refresh"):
+        _sync_table()
+
+def _sync_table():
+    global view_top, visible_ranks
+    count = visible_row_count()
+    total = len(order_view)
+    view_top = max(0, min(view_top, total - count))
+    teams = order_view.window(view_top, count)
+    items = tree.get_children()
+    for index, team in enumerate(teams):
+        if index < len(items):
+            tree.item(slot_id(index), values=team.as_row())
+        else:
+            tree.insert("", "end", iid=slot_id(index), values=team.as_row())
+    if len(items) > len(teams):
+        tree.delete(*items[len(teams):])
+    visible_ranks = [team.rank for team in teams]
+
+    wanted = (slot_id(visible_ranks.index(selected_rank)),) if selected_rank in visible_ranks else ()
+    if tree.selection() != wanted:
+        tree.selection_set(wanted)
+    if total:
+        vsb.set(view_top / total, (view_top + len(teams)) / total)
+    else:
+        vsb.set(0, 1)
+
+def scroll_view(*args):
+    """Scrollbar command ("moveto", fraction) / ("scroll", n, "units"|"pages"): moves the visible window."""
+    global view_top
+    if args[0] == "moveto":
+        view_top = int(float(args[1]) * len(order_view))
+    elif args[0] == "scroll":
+        view_top += int(args[1]) * (visible_row_count() if args[2] == "pages" else 1)
+    update_table()
+
+def on_mouse_wheel(event):
+    """Scrolls WHEEL_ROWS rows per notch (Windows/macOS delta, or X11 buttons 4/5)."""
+    up = event.num == 4 or event.delta > 0
+    scroll_view("scroll", -WHEEL_ROWS if up else WHEEL_ROWS, "units")
+    return "break"
+
+def select_rank(rank):
+    """Selects team #rank: scrolls it into view and fills the entry fields."""
+    global selected_rank, view_top
+    team = store.get(rank)
+    if team is None:
+        return
+    with metrics.timer("select"):
+        selected_rank = rank
+        position = order_view.position(rank)
+        count = visible_row_count()
+        if position < view_top:
+            view_top = position
+        elif position >= view_top + count:
+            view_top = position - count + 1
+        select_entry(team)
+        update_table()
+
+def on_tree_click(event):
+    """Selects the clicked row. Replaces the Treeview's own selection, whose items are reused rows."""
+    if tree.identify_region(event.x, event.y) != "cell":
+        return None # Headings keep their sort command, separators their resizing
+    iid = tree.identify_row(event.y)
+    if iid:
+        select_rank(visible_ranks[tree.index(iid)])
+    tree.focus_set()
+    return "break"
+
+def move_selection(step):
+    """Selects the team `step` rows below (negative: above) the selected one, for the arrow/page keys."""
+    total = len(order_view)
+    if total:
+        position = order_view.position(selected_rank) if selected_rank is not None else None
+        position = view_top if position is None else max(0, min(total - 1, position + step))
+        select_rank(order_view.window(position, 1)[0].rank)
+    return "break"
+
+def find_team(event=None):
+    """Selects the first team whose name starts with, or else contains, the search text.
+
+    Pressing Enter again steps to the next match.
+    """
+    query = search_var.get().strip()
+    if not query:
+        return
+    if query != search_state["query"] or event is None:
+        with metrics.timer("search"):
+            matches = search_index.search(query)
+        search_state.update(query=query, matches=matches, cursor=-1)
+    matches = search_state["matches"]
+    if not matches:
+        status_label.config(text=f"No team matches '{query}'.", fg="orange")
+        return
+    search_state["cursor"] = (search_state["cursor"] + 1) % len(matches)
+    select_rank(matches[search_state["cursor"]])
+    total = f"{len(matches)}+" if len(matches) >= SEARCH_LIMIT else len(matches)
+    status_label.config(text=f"Match {search_state['cursor'] + 1} of {total} for '{query}'.", fg="blue")
 
-    # Backup
+def jump_to_rank(event=None):
+    """Selects and scrolls to the team with the # typed in the jump box."""
     try:
-        if os.path.exists(HTML_FILE):
-            shutil.copy2(HTML_FILE, BACKUP_FILE)
-    except Exception as e:
-        # Log backup error but proceed with save attempt
-        print(f"Warning: Could not create backup file: {e}")
-        status_label.config(text="Backup failed, attempting save...", fg="orange")
-        root.update_idletasks()
-
-    # Sort data by Rank (# column, index 0) before saving
-    current_data = sorted(data, key=lambda x: int(x[0]))
+        rank = int(jump_var.get().strip())
+    except ValueError:
+        status_label.config(text="# must be a number!", fg="red"); return
+    if rank not in store:
+        status_label.config(text=f"# {rank} does not exist!", fg="red"); return
+    select_rank(rank)
+    if rapid_var.get():
+        jump_var.set("")
+        tree.focus_set() # Straight back to toggling players
+
+# --- Rapid Entry (F2) ---
+def toggle_rapid_entry(event=None):
+    """Turns rapid entry on or off. F2 flips the checkbox; clicking it calls this with the new value."""
+    if event is not None:
+        rapid_var.set(not rapid_var.get())
+    if rapid_var.get():
+        tree.focus_set()
+        status_label.config(text=RAPID_HELP, fg="blue")
+    else:
+        status_label.config(text="Rapid entry off.", fg="blue")
+    return "break"
+
+def rapid_toggle(index):
+    """Rapid entry: flips player `index` of the selected team (None: all players down) and commits it at once.
+
+    The row goes to the store, journal and push server (--serve) straight
+    away; the overlay file follows after a short debounce. Keypress latency is
+    recorded as key_commit (row in the store), key_to_overlay (row sent to the
+    live overlay) and key_to_file (overlay file written).
+    """
+    if not rapid_var.get():
+        return None
+    started = time.perf_counter()
+    team = store.get(selected_rank) if selected_rank is not None else None
+    if team is None:
+        status_label.config(text="Select a team first (↑/↓, Ctrl+F or Ctrl+G).", fg="red")
+        return "break"
+    status = 0 if index is None else toggle_indicator(team.status, index)
+    if status == team.status:
+        status_label.config(text=f"# {team.rank} {team.name} is already eliminated.", fg="orange")
+        return "break"
+    if sharing:
+        # Sent as a toggle of the host's current status, not as a versioned edit, so a
+        # second key pressed before the first one's ack does not conflict with it
+        request = {"op": "eliminate"} if index is None else {"op": "toggle", "indicator": index}
+        if not share_edit(dict(request, rank=team.rank)):
+            return "break" # Refused, or a joined operator's edit: the host commits and saves it
+    else:
+        store.update(team.rank, status=status)
+    metrics.record("key_commit", time.perf_counter() - started)
+    if push_server and lobby is lobby_set.first():
+        push_server.mark("key_to_overlay", started)
+    writer.mark("key_to_file", started)
+    select_entry(store.get(team.rank))
+    update_table()
+    schedule_save(RAPID_SAVE_DELAY_MS, RAPID_MAX_SAVE_WAIT_MS)
+    status_label.config(text=f"# {team.rank} {team.name}: {mask_to_status(status)}", fg="green")
+    return "break"
+
+def focus_field(entry):
+    """Ctrl+F / Ctrl+G: puts the cursor in the find or go-to box with its text selected."""
+    entry.focus_set()
+    entry.select_range(0, tk.END)
+    return "break"
 
-    table = soup.find("table")
-    if not table:
-        status_label.config(text="HTML <table> tag missing, cannot save.", fg="red")
+# --- Auto Save Logic ---
+def perform_save(target_lobby=None):
+    """Hands snapshots of target_lobby (default: every edited lobby) and the overall table to the background writers.
+
+    Never blocks on disk I/O.
+    """
+    global renderer, status_label
+    if target_lobby:
+        target_lobby.save_job = None
+    if not (target_lobby.renderer if target_lobby else renderer):
+        status_label.config(text="HTML structure missing, cannot save.", fg="red")
         return
 
-    # Ensure thead exists
-    thead = table.find('thead')
-    if not thead:
-         thead = soup.new_tag('thead')
-         header_row = soup.new_tag('tr')
-         # Use '#' for header now
-         for col_name in ("#", "Team", "Points", "Status"):
-             th = soup.new_tag('th')
-             th.string = col_name
-             header_row.append(th)
-         thead.append(header_row)
-         table.insert(0, thead)
-
-    # Ensure tbody exists and clear it
-    tbody = table.find('tbody')
-    if not tbody:
-        tbody = soup.new_tag('tbody')
-        existing_rows = [row for row in table.find_all('tr') if not row.find('th')]
-        for row in existing_rows:
-            tbody.append(row.extract())
-        table.append(tbody)
+    # Rows are always written sorted by Rank (# column), whatever the Treeview shows
+    with metrics.timer("save"):
+        queued = lobby_set.save([target_lobby.name] if target_lobby else None)
+    if queued:
+        shown = f" {', '.join(queued)}" if len(lobby_set) > 1 else ""
+        status_label.config(text=f"Auto-saving{shown}...", fg="orange") # Indicate saving started
     else:
-        tbody.clear()
-
-    # Add new rows from sorted data into tbody
-    for row_values in current_data:
-        new_row = soup.new_tag("tr")
-        for i, cell_value in enumerate(row_values):
-            new_td = soup.new_tag("td")
-            if i == 3: # Status column index
-                cell_value = str(cell_value).replace("✅", "🟩").replace("❌", "🟥")
-            new_td.string = str(cell_value)
-            new_row.append(new_td)
-        tbody.append(new_row)
-
-    # Save the modified HTML
-    try:
-        with open(HTML_FILE, "w", encoding="utf-8") as file:
-            # Remove the <h1> title if it exists before writing
-            h1_title = soup.find("h1")
-            if h1_title:
-                h1_title.decompose() # Remove the h1 tag
-            # Also remove the <title> tag content in <head> if needed? No, keep window title.
-
-            file.write(soup.prettify())
-        status_label.config(text="Data auto-saved successfully!", fg="green")
-        data = current_data # Ensure internal data matches saved sorted data
-    except Exception as e:
-        status_label.config(text=f"Error auto-saving data: {e}", fg="red")
-        # If save fails, maybe trigger manual save option? For now, just report error.
-
-def schedule_save():
-    """Schedules the perform_save function after a delay, cancelling previous jobs."""
-    global auto_save_job, root, status_label
-    # Cancel any existing scheduled save
-    if auto_save_job:
-        root.after_cancel(auto_save_job)
+        status_label.config(text=f"No changes to save. ({save_counts_text()})", fg="green")
+
+def save_counts_text():
+    """Short summary of how many saves (of all lobbies) were written vs. skipped as redundant."""
+    written = skipped = 0
+    for _label, lobby_writer in lobby_set.writers():
+        stats = lobby_writer.stats()
+        written += stats["written"]
+        skipped += stats["skipped_clean"] + stats["skipped_identical"]
+    return f"{written} written, {skipped} skipped"
+
+def poll_save_results():
+    """Reports finished background saves on status_label. Runs on the Tk thread."""
+    for label, lobby_writer in lobby_set.writers():
+        prefix = f"{label}: " if len(lobby_set) > 1 else ""
+        try:
+            while True:
+                result = lobby_writer.results.get_nowait()
+                if result.backup_error:
+                    # Log backup error; the save itself was still attempted
+                    print(f"Warning: Could not create backup file of {lobby_writer.path}: {result.backup_error}")
+                if result.skipped:
+                    status_label.config(text=f"{prefix}Overlay already up to date. ({save_counts_text()})", fg="green")
+                elif result.ok:
+                    status_label.config(text=f"{prefix}Data auto-saved successfully! ({save_counts_text()})", fg="green")
+                else:
+                    status_label.config(text=f"{prefix}Error auto-saving data: {result.error}", fg="red")
+        except queue.Empty:
+            pass
+    root.after(SAVE_POLL_INTERVAL_MS, poll_save_results)
+
+def schedule_save(delay_ms=AUTO_SAVE_DELAY_MS, max_wait_ms=None, target_lobby=None):
+    """Schedules perform_save of target_lobby (default: the shown lobby) after a delay, cancelling its previous job.
+
+    Every lobby has its own job, so edits in one lobby never put off
+    another lobby's save. With max_wait_ms (rapid entry), the save is not
+    put off for longer than that after the first unsaved edit, however
+    quickly edits keep coming.
+    """
+    global root, status_label
+    if sharing and not sharing.is_host:
+        return # The host saves; joined operators never write the overlay
+    target_lobby = target_lobby or lobby
+    now = time.monotonic()
+    # Cancel any existing scheduled save of this lobby
+    if target_lobby.save_job:
+        root.after_cancel(target_lobby.save_job)
+    else:
+        target_lobby.save_first_edit = now
+    if max_wait_ms is not None:
+        delay_ms = max(0, min(delay_ms, int((target_lobby.save_first_edit - now) * 1000) + max_wait_ms))
 
     # Schedule the save
     status_label.config(text="Changes detected, scheduling auto-save...", fg="blue")
-    auto_save_job = root.after(AUTO_SAVE_DELAY_MS, perform_save)
+    target_lobby.save_job = root.after(delay_ms, lambda: perform_save(target_lobby))
+
+
+# --- Shared Editing (--host / --join) ---
+def share_edit(request):
+    """Sends a row edit through the sharing session. Returns True if it has already been applied.
+
+    On the host the edit is applied (or refused) at once; a joined operator
+    gets the host's answer a moment later via poll_sharing().
+    """
+    reply = sharing.submit(request)
+    if reply is None:
+        status_label.config(text=f"Sent to {sharing.address}...", fg="orange")
+        return False
+    return handle_sharing_reply(reply)
+
+def handle_sharing_reply(reply):
+    """Reports the host's answer to one of our edits. Returns True if it was applied."""
+    global selected_version
+    kind = reply.get("type")
+    if kind == "ack":
+        if reply["rank"] == selected_rank:
+            selected_version = reply["version"] # Our own edit is not a conflict for the next one
+        status_label.config(text=f"# {reply['rank']} saved.", fg="green")
+        return True
+    if kind == "conflict":
+        rank = reply["rank"]
+        if rank == selected_rank and rank in store:
+            select_rank(rank) # Show what the other operator saved
+        status_label.config(text=f"{reply['message']} Your edit was not applied; check the row and try again.", fg="red")
+        return False
+    status_label.config(text=f"Edit not applied: {reply.get('message')}", fg="red")
+    return False
+
+def host_only(action):
+    """True if this editor may change the whole table at once; joined operators edit row by row."""
+    if sharing and not sharing.is_host:
+        status_label.config(text=f"{action} is only available on the host editor ({sharing.address}).", fg="red")
+        return False
+    return True
+
+def poll_sharing():
+    """Applies other operators' edits and the host's answers to ours. Runs on the Tk thread."""
+    try:
+        generation = store.generation
+        if sharing.is_host:
+            with lobby.undo.paused(): # Undo only steps back through this editor's own edits
+                replies = sharing.process()
+        else:
+            replies = sharing.process()
+        for reply in replies:
+            handle_sharing_reply(reply)
+        if store.generation != generation:
+            update_table()
+            if sharing.is_host:
+                schedule_save()
+    finally:
+        root.after(SHARING_POLL_INTERVAL_MS, poll_sharing) # Keep serving operators whatever one edit did
+
+def start_sharing_host(address):
+    """Lets other editors join (--join) and edit this table row by row."""
+    global sharing
+    from sharing import SharingHost # Pulls in asyncio; only needed with --host
+    sharing = SharingHost(store, *address, token=args.token)
+    try:
+        sharing.start()
+    except (OSError, StandingsError) as e:
+        sharing = None
+        messagebox.showerror("Sharing Error", f"Could not accept operators on {address[0]}:{address[1]}: {e}")
+        return
+    token = " --token ..." if sharing.token else ""
+    status_label.config(text=f"Other operators can join with: python bgmi.py --join {sharing.address}{token}", fg="blue")
+
+
+# --- Outside Edits of the Overlay Files (--watch) ---
+def after_lobby_write(saved_lobby, snapshot, stat):
+    """Runs on the writer pool after each overlay write: keeps the parse cache and the watch base in step.
+
+    The cache rarely saves a parse (the journal is loaded instead), but it is
+    the base for merging edits made to the file while the editor was closed.
+    Its key is the file as written, so an outside edit that lands before
+    this hook runs still shows up as a change.
+    """
+    write_cache(saved_lobby.path, saved_lobby.cache_path, snapshot, key=file_key(saved_lobby.path, stat))
+    if saved_lobby.watcher:
+        saved_lobby.watcher.set_base(snapshot)
+
+def start_watching():
+    """Starts watching every lobby's overlay file for edits made outside the editor."""
+    for each_lobby in lobby_set:
+        try:
+            base_rows = load_file(each_lobby.path, each_lobby.cache_path).store.snapshot()
+        except (OSError, UnicodeDecodeError, LoadError):
+            base_rows = () # Nothing usable on disk yet: everything in a new file counts as an outside edit
+        each_lobby.watcher = ExternalEditWatcher(each_lobby.path, each_lobby.writer, base_rows)
+    status_label.config(text=f"Watching overlay files for outside edits ({lobby_set.first().watcher.mode}).", fg="blue")
+
+def poll_external_edits():
+    """Merges outside edits of the overlay files into the stores. Runs on the Tk thread."""
+    for each_lobby in lobby_set:
+        merge_external_edit(each_lobby)
+    root.after(WATCH_POLL_INTERVAL_MS, poll_external_edits)
+
+def conflict_text(rank, ours, theirs):
+    """One line describing a row both the editor and the file changed."""
+    def describe(row):
+        return "deleted" if row is None else f"{row.name}, {row.points} pts, {mask_to_status(row.status)}"
+    return f"# {rank}: editor has {describe(ours)}; file has {describe(theirs)}"
+
+def resolve_outside_edit(merge, what_happened, our_edits):
+    """Returns (rows, deletes, use_file) to apply for a Merge, asking which version of conflicting rows to keep."""
+    rows, deletes, conflicts = merge
+    if not conflicts:
+        return rows, deletes, False
+    lines = "\n".join(conflict_text(*conflict) for conflict in conflicts[:MAX_WARNINGS_SHOWN])
+    if len(conflicts) > MAX_WARNINGS_SHOWN:
+        lines += f"\n...and {len(conflicts) - MAX_WARNINGS_SHOWN} more."
+    with waiting_for_user():
+        use_file = messagebox.askyesno(
+            "Outside Edit Conflict",
+            f"{what_happened}, and {len(conflicts)} of the changed teams also {our_edits}:\n{lines}\n\n"
+            "Use the file's version of these teams?\n(No keeps the editor's version, which will be saved over the file.)")
+    if use_file:
+        rows = rows + [theirs for _rank, _ours, theirs in conflicts if theirs is not None]
+        deletes = deletes + [rank for rank, ours, theirs in conflicts if theirs is None and ours is not None]
+    return rows, deletes, use_file
+
+def merge_external_edit(edited_lobby):
+    """Applies rows changed in the lobby's overlay file, asking what to do about rows with unsaved edits here."""
+    global renderer
+    try:
+        edit = edited_lobby.watcher.poll(edited_lobby.store)
+    except (OSError, UnicodeDecodeError, LoadError) as e:
+        status_label.config(text=f"Could not read the outside edit of {edited_lobby.path}: {e}", fg="orange")
+        return
+    if edit is None:
+        return
+    rows, deletes, use_file = resolve_outside_edit(
+        edit.merge, f"{edited_lobby.path} was changed outside the editor", "have edits here that are not saved yet")
+    conflicts = edit.merge.conflicts
+    try:
+        with edited_lobby.undo.paused(): # Not an edit of ours to undo
+            changed = edited_lobby.store.apply_batch(rows, deletes)
+    except StandingsError as e:
+        messagebox.showerror("Outside Edit Error", f"Could not merge the outside edit of {edited_lobby.path}:\n{e}")
+        return
+    edited_lobby.watcher.accept(edit.rows)
+    # The page around the table may have been edited too
+    new_renderer = OverlayRenderer(edit.html_text)
+    page_changed = (new_renderer.prefix, new_renderer.suffix) != (edited_lobby.renderer.prefix, edited_lobby.renderer.suffix)
+    if not (changed or conflicts or page_changed):
+        return # E.g. a save of ours that landed while the file was being read
+    show_load_warnings(edit.warnings)
+    edited_lobby.renderer = new_renderer
+    edited_lobby.writer.invalidate()
+    if edited_lobby is lobby:
+        renderer = edited_lobby.renderer
+        update_table()
+    if page_changed and push_server and edited_lobby is lobby_set.first():
+        push_server.reset(edited_lobby.store.snapshot(), edited_lobby.renderer) # The live page gets the new markup too
+    if conflicts and not use_file:
+        schedule_save(target_lobby=edited_lobby) # Put the editor's version back in the file
+    kept = f", kept {len(conflicts)} unsaved edit(s)" if conflicts and not use_file else ""
+    status_label.config(text=f"Merged outside edit of {edited_lobby.path}: {changed} team(s) updated{kept}.", fg="blue")
 
 
 # --- GUI Action Functions (select_entry, add_entry, update_entry, delete_entry, clear_all_data, toggle_status, clear_entry_fields) ---
 
-def select_entry(event):
-    """Populates entry fields when a row is selected."""
-    selected_item = tree.selection()
-    if selected_item:
-        values = tree.item(selected_item[0], "values")
-        # Use column indices now which are stable: 0=#, 1=Team, 2=Points, 3=Status
-        rank_var.set(values[0])
-        team_var.set(values[1])
-        points_var.set(values[2])
-        status_string = values[3]
-        for i, btn in enumerate(status_buttons):
-            if i < len(status_string):
-                is_alive = (status_string[i] == "✅")
-                btn.config(text="✅" if is_alive else "❌", relief=tk.SUNKEN if is_alive else tk.RAISED)
-            else:
-                 btn.config(text="❌", relief=tk.RAISED)
-        status_label.config(text="Entry selected.", fg="blue")
-    else:
-         clear_entry_fields()
+def select_entry(team):
+    """Populates entry fields for the selected team."""
+    global selected_version
+    if sharing:
+        selected_version = sharing.version(team.rank)
+    rank_var.set(team.rank)
+    team_var.set(team.name)
+    points_var.set(team.points)
+    for i, btn in enumerate(status_buttons):
+        is_alive = bool(team.status & (1 << i))
+        btn.config(text="✅" if is_alive else "❌", relief=tk.SUNKEN if is_alive else tk.RAISED)
+    status_label.config(text="Entry selected.", fg="blue")
+
+def status_from_buttons():
+    """Returns the status bitmask currently shown on the status buttons."""
+    mask = 0
+    for i, btn in enumerate(status_buttons):
+        if btn["relief"] == tk.SUNKEN:
+            mask |= 1 << i
+    return mask
 
 def add_entry():
     """Adds a new entry and schedules an auto-save."""
-    global data
-    # Use column indices for data structure: 0=#, 1=Team, 2=Points, 3=Status
     new_rank_str = rank_var.get().strip()
     new_team = team_var.get().strip()
     new_points_str = points_var.get().strip()
-    new_status = ''.join(["✅" if btn["relief"] == tk.SUNKEN else "❌" for btn in status_buttons])
 
     # Validation...
     if not new_team:
@@ -238,86 +644,220 @@ def add_entry():
     except ValueError:
         status_label.config(text="Points must be a number!", fg="red"); return
 
-    for entry in data:
-        if entry[0] == new_rank:
-            status_label.config(text=f"# {new_rank} already exists!", fg="red"); return
+    if sharing:
+        if not share_edit({"op": "edit", "rank": new_rank, "version": 0, "name": new_team, "points": new_points, "status": status_from_buttons()}):
+            return
+        new_team_record = store.get(new_rank)
+    else:
+        try:
+            new_team_record = store.add(new_rank, new_team, new_points, status_from_buttons())
+        except StandingsError as e:
+            status_label.config(text=str(e), fg="red"); return
 
-    new_entry_data = [new_rank, new_team, new_points, new_status]
-    data.append(new_entry_data)
-    tree.insert("", "end", values=new_entry_data)
-    status_label.config(text="Entry added.", fg="green")
     clear_entry_fields()
-    new_item_id = tree.get_children()[-1]
-    if new_item_id:
-        tree.selection_set(new_item_id); tree.focus(new_item_id); tree.see(new_item_id)
+    select_rank(new_team_record.rank) # Scrolls to the new row
+    status_label.config(text="Entry added.", fg="green")
     schedule_save() # Schedule save after adding
 
 def update_entry():
     """Updates the status of the selected entry and schedules an auto-save."""
-    global data
-    selected_item = tree.selection()
-    if selected_item:
-        selected_item_id = selected_item[0]
-        current_values = tree.item(selected_item_id, "values")
-        # Use indices: 0=#, 1=Team, 2=Points, 3=Status
-        current_rank = int(current_values[0])
-        current_team = current_values[1]
-        current_points = int(current_values[2])
-        new_status = ''.join(["✅" if btn["relief"] == tk.SUNKEN else "❌" for btn in status_buttons])
-
-        tree.item(selected_item_id, values=(current_rank, current_team, current_points, new_status))
-
-        updated = False
-        for i, entry in enumerate(data):
-             if entry[0] == current_rank:
-                 data[i] = [current_rank, current_team, current_points, new_status]
-                 updated = True
-                 break
-        if updated:
-             status_label.config(text="Entry status updated.", fg="green")
-             schedule_save() # Schedule save after updating
+    if selected_rank is not None:
+        if sharing:
+            if not share_edit({"op": "edit", "rank": selected_rank, "version": selected_version, "status": status_from_buttons()}):
+                return
         else:
-             status_label.config(text="Error updating data list.", fg="red")
+            try:
+                store.update(selected_rank, status=status_from_buttons())
+            except StandingsError:
+                status_label.config(text="Error updating data list.", fg="red"); return
+        update_table()
+        status_label.config(text="Entry status updated.", fg="green")
+        schedule_save() # Schedule save after updating
     else:
         status_label.config(text="Please select a row to update!", fg="red")
 
 def delete_entry():
     """Deletes the selected entry and schedules an auto-save."""
-    global data
-    selected_item = tree.selection()
-    if selected_item:
-        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected entry?"):
-            selected_item_id = selected_item[0]
-            values = tree.item(selected_item_id, "values")
-            try:
-                 rank_to_delete = int(values[0]) # Index 0 is '#'
-                 tree.delete(selected_item_id)
-                 data_len_before = len(data)
-                 data = [entry for entry in data if entry[0] != rank_to_delete]
-                 if len(data) < data_len_before:
-                      status_label.config(text="Entry deleted.", fg="orange")
-                      clear_entry_fields()
-                      schedule_save() # Schedule save after deleting
-                 else:
-                      status_label.config(text="Error deleting from data list.", fg="red")
-            except (ValueError, IndexError):
-                 status_label.config(text="Error reading # from selected item.", fg="red")
+    if selected_rank is not None:
+        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected entry?\n(Undo with Ctrl+Z.)"):
+            if sharing:
+                if not share_edit({"op": "delete", "rank": selected_rank, "version": selected_version}):
+                    return
+            else:
+                try:
+                     store.delete(selected_rank)
+                except StandingsError:
+                     status_label.config(text="Error deleting from data list.", fg="red"); return
+            clear_entry_fields()
+            update_table()
+            status_label.config(text="Entry deleted.", fg="orange")
+            schedule_save() # Schedule save after deleting
     else:
         status_label.config(text="Please select a row to delete!", fg="red")
 
 
 def clear_all_data():
     """Clears all data and schedules an auto-save."""
-    global data, soup
-    if messagebox.askyesno("Confirm Clear All", "Are you sure you want to clear ALL data?"):
-        data.clear()
-        for row in tree.get_children():
-            tree.delete(row)
-        status_label.config(text="All data cleared.", fg="red")
+    if not host_only("Clear All"):
+        return
+    if messagebox.askyesno("Confirm Clear All", "Are you sure you want to clear ALL data?\n(Undo with Ctrl+Z.)"):
+        store.clear()
         clear_entry_fields()
+        update_table()
+        status_label.config(text="All data cleared.", fg="red")
         schedule_save() # Schedule save after clearing
 
 
+def undo_edit(redo=False):
+    """Undoes (or redoes) the latest edit of the shown lobby: one batch of rows, one debounced save."""
+    action = "Redo" if redo else "Undo"
+    if not host_only(action):
+        return "break"
+    try:
+        change = lobby.undo.redo() if redo else lobby.undo.undo()
+    except StandingsError as e:
+        status_label.config(text=f"Cannot {action.lower()}: {e}", fg="red")
+        done = "redone" if redo else "undone"
+        if messagebox.askyesno(f"{action} Conflict", f"Cannot {action.lower()} the latest edit:\n{e}\n\n"
+                               f"Skip it, keeping the current values, so that earlier edits can be {done}?"):
+            lobby.undo.skip(redo)
+            status_label.config(text="Skipped one edit; the current values were kept.", fg="orange")
+        return "break"
+    if change is None:
+        status_label.config(text=f"Nothing to {action.lower()}.", fg="orange")
+        return "break"
+    if selected_rank in store:
+        select_rank(selected_rank) # Show the selected team's restored values
+    else:
+        clear_entry_fields()
+        update_table()
+    schedule_save() # Repeated undos still make a single save
+    status_label.config(text=f"{'Redone' if redo else 'Undone'}: {describe(change)}.", fg="green")
+    return "break"
+
+
+def apply_import(rows, replace):
+    """Applies imported rows as one transaction: one Treeview refresh, one save."""
+    try:
+        changed = store.apply_batch(rows, replace=replace)
+    except StandingsError as e:
+        messagebox.showerror("Import Error", str(e))
+        return False
+    update_table()
+    clear_entry_fields()
+    if changed:
+        schedule_save() # A single save for the whole batch
+    status_label.config(text=f"Imported {len(rows)} rows, {changed} teams changed.", fg="green")
+    return True
+
+
+def open_bulk_import():
+    """Opens a paste box for CSV/JSON standings (or a file) to apply in one go."""
+    if not host_only("Bulk Import"):
+        return
+    window = tk.Toplevel(root)
+    window.title("Bulk Import")
+    tk.Label(window, justify="left", anchor="w",
+             text="Paste CSV (#,Team,Points,Status) or JSON, or import a file. Points/Status may be left empty to keep current values.").pack(fill="x", padx=10, pady=(10, 5))
+    text_box = tk.Text(window, width=70, height=18)
+    text_box.pack(fill="both", expand=True, padx=10)
+    replace_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(window, text="Replace all teams (delete teams not in the import)", variable=replace_var).pack(anchor="w", padx=10)
+
+    def import_file():
+        path = filedialog.askopenfilename(parent=window, filetypes=[("Standings", "*.csv *.tsv *.txt *.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            rows = read_import_file(path)
+        except StandingsError as e:
+            messagebox.showerror("Import Error", str(e), parent=window)
+            return
+        if rows and apply_import(rows, replace_var.get()):
+            window.destroy()
+
+    def apply():
+        try:
+            rows = parse_import(text_box.get("1.0", "end"))
+        except StandingsError as e:
+            messagebox.showerror("Import Error", str(e), parent=window)
+            return
+        if rows and apply_import(rows, replace_var.get()):
+            window.destroy()
+
+    bulk_buttons = tk.Frame(window)
+    bulk_buttons.pack(fill="x", padx=10, pady=10)
+    tk.Button(bulk_buttons, text="Import File...", command=import_file).pack(side="left")
+    tk.Button(bulk_buttons, text="Apply", command=apply).pack(side="right")
+    tk.Button(bulk_buttons, text="Cancel", command=window.destroy).pack(side="right", padx=5)
+
+
+def load_scoring_engine():
+    """Imports the scoring engine on first use (it needs NumPy) and loads the lobby's saved match results."""
+    if lobby.scoring_engine is None:
+        from scoring import ScoringEngine
+        if os.path.exists(lobby.matches_path):
+            with open(lobby.matches_path, "r", encoding="utf-8") as file:
+                lobby.scoring_engine = ScoringEngine.from_dict(json.load(file))
+        else:
+            lobby.scoring_engine = ScoringEngine()
+    return lobby.scoring_engine
+
+
+def open_match_results():
+    """Enters one match's placements and kills, then recomputes Points and # for every team."""
+    if not host_only("Match Results"):
+        return
+    try:
+        engine = load_scoring_engine()
+    except ImportError:
+        messagebox.showerror("Scoring Unavailable", "Match scoring needs NumPy. Install it with: pip install numpy")
+        return
+    except (OSError, ValueError, KeyError, TypeError, StandingsError) as e:
+        messagebox.showerror("Scoring Error", f"Could not read {lobby.matches_path}: {e}")
+        return
+
+    window = tk.Toplevel(root)
+    window.title(f"Match Results - {lobby.name}" if len(lobby_set) > 1 else "Match Results")
+    match_frame = tk.Frame(window)
+    match_frame.pack(fill="x", padx=10, pady=(10, 5))
+    tk.Label(match_frame, text="Match #:").pack(side="left")
+    match_var = tk.IntVar(value=engine.num_matches + 1)
+    tk.Spinbox(match_frame, from_=1, to=engine.num_matches + 1, textvariable=match_var, width=5).pack(side="left", padx=5)
+    tk.Label(window, justify="left", anchor="w",
+             text="One line per team: Team,Placement,Kills. Entering an existing match number replaces its results.").pack(fill="x", padx=10)
+    text_box = tk.Text(window, width=50, height=18)
+    text_box.pack(fill="both", expand=True, padx=10)
+
+    def apply():
+        try:
+            match = match_var.get() - 1
+            if not 0 <= match <= engine.num_matches:
+                raise StandingsError(f"Match # must be between 1 and {engine.num_matches + 1}.")
+            results = parse_match_results(text_box.get("1.0", "end"))
+            updated, rows = engine.with_match(match, results, store)
+        except (StandingsError, tk.TclError) as e:
+            messagebox.showerror("Match Results Error", str(e), parent=window)
+            return
+        if not apply_import(rows, replace=True):
+            return # Rejected: the engine and BGMI.matches.json are unchanged
+        lobby.scoring_engine = updated
+        try:
+            write_atomic(lobby.matches_path, json.dumps(updated.to_dict()))
+        except OSError as e:
+            messagebox.showerror("Match Results Error", f"Standings updated, but {lobby.matches_path} could not be saved: {e}")
+        missing = updated.missing_teams(store)
+        if missing:
+            status_label.config(text=f"Results of teams no longer in the table were left out: {', '.join(missing[:5])}"
+                                     + (" ..." if len(missing) > 5 else ""), fg="orange")
+        window.destroy()
+
+    match_buttons = tk.Frame(window)
+    match_buttons.pack(fill="x", padx=10, pady=10)
+    tk.Button(match_buttons, text="Apply", command=apply).pack(side="right")
+    tk.Button(match_buttons, text="Cancel", command=window.destroy).pack(side="right", padx=5)
+
+
 def toggle_status(index):
     """Toggles a status button. Does NOT auto-save immediately, relies on Update Status click."""
     # Note: We don't schedule save here, only when "Update Status" is clicked.
@@ -329,6 +869,8 @@ def toggle_status(index):
 
 def clear_entry_fields():
     """Clears the input fields and resets status buttons."""
+    global selected_rank
+    selected_rank = None
     rank_var.set("")
     team_var.set("")
     points_var.set("")
@@ -339,54 +881,111 @@ def clear_entry_fields():
 
 # --- Sorting Logic ---
 def sort_column(tv, col, reverse):
-    """Sorts the Treeview and data list by the clicked column."""
-    global data, sort_column_cache
-    try:
-        # Map display column name to internal data index
-        col_map = {"#": 0, "Team": 1, "Points": 2, "Status": 3}
-        if col not in col_map:
-            raise ValueError(f"Unknown column: {col}")
-        col_index = col_map[col]
-
-        if col in ("#", "Points"):
-             key_func = lambda x: int(x[col_index])
-        else: # Team, Status (string sort)
-             key_func = lambda x: str(x[col_index]).lower()
-
-        data.sort(key=key_func, reverse=reverse)
-
-    except ValueError as e:
-        messagebox.showerror("Sort Error", f"Cannot sort column '{col}'. Check data type. Error: {e}")
+    """Sorts the Treeview by the clicked column. The store itself has no order."""
+    global sort_column_cache
+    if col not in COLUMNS:
+        messagebox.showerror("Sort Error", f"Cannot sort column '{col}'. Unknown column.")
         return
-    except IndexError:
-         messagebox.showerror("Sort Error", f"Invalid column index for '{col}'.")
-         return
+    sort_column_cache = {"column": col, "reverse": reverse}
 
-    update_table() # Refresh treeview based on sorted 'data'
+    with metrics.timer("sort"):
+        order_view.set_sort(col, reverse)
+        update_table() # Re-fill the visible rows
 
     # Update header arrows
-    display_cols = ("#", "Team", "Points", "Status") # Use display names for headers
-    for c in display_cols:
+    for c in COLUMNS: # Use display names for headers
          tv.heading(c, text=c)
     tv.heading(col, text=col + (' ▼' if reverse else ' ▲'), command=lambda _col=col: sort_column(tv, _col, not reverse))
-    sort_column_cache = {"column": col, "reverse": reverse}
 
 
 # --- Window Closing Logic ---
 def on_closing():
     """Handles the window close event cleanly."""
-    global auto_save_job
-    # Cancel any pending auto-save before closing
-    if auto_save_job:
-        root.after_cancel(auto_save_job)
-        # Optional: ask if user wants to save *now* if a job was pending?
-        # For simplicity, we just cancel and close. Assume recent changes were saved.
+    # Don't wait out the debounce delay: save pending changes right away
+    pending = [each_lobby for each_lobby in lobby_set if each_lobby.save_job]
+    for each_lobby in pending:
+        root.after_cancel(each_lobby.save_job)
+        each_lobby.save_job = None
+    if pending:
+        perform_save()
+    lobby_set.close() # Waits for the last writes to land
+    for each_lobby in lobby_set:
+        each_lobby.journal.close()
+        each_lobby.timeline.close()
+        if each_lobby.watcher:
+            each_lobby.watcher.close()
+    if push_server:
+        push_server.stop()
+    if sharing:
+        sharing.stop()
     root.destroy()
 
 
+def refresh_stats_line():
+    """Shows p50/p95 latencies of the hot paths on the stats line (--stats)."""
+    stats_label.config(text=metrics.summary_line(("load", "save", "render", "write", "view_refresh", "sort", "select", "search",
+                                                   "key_commit", "key_to_overlay", "key_to_file")))
+    root.after(STATS_REFRESH_MS, refresh_stats_line)
+
+
+def export_stats():
+    """Saves all timings and counters (including save/skip counts) as JSON."""
+    path = filedialog.asksaveasfilename(defaultextension=".json", initialfile="BGMI.stats.json", filetypes=[("JSON", "*.json")])
+    if path:
+        metrics.export_json(path)
+        status_label.config(text=f"Stats exported to {path}.", fg="blue")
+
+
+def start_push_server(port):
+    """Serves the overlay on localhost and pushes every store change to open pages.
+
+    With several lobbies, this is the first lobby's overlay.
+    """
+    global push_server
+    from server import PushServer # Pulls in asyncio; only needed in --serve mode
+    push_server = PushServer(renderer, port=port)
+    try:
+        push_server.start(store.snapshot())
+    except OSError as e:
+        push_server = None
+        messagebox.showerror("Server Error", f"Could not start the overlay server on port {port}: {e}")
+        return
+    store.add_listener(push_server.publish)
+    status_label.config(text=f"Live overlay at {push_server.url} (use it as the OBS browser source).", fg="blue")
+
+
 # ==============================================================================
 # --- Main Application Setup ---
 # ==============================================================================
+parser = argparse.ArgumentParser(description="BGMI Tournament Editor")
+parser.add_argument("--serve", nargs="?", type=int, const=DEFAULT_SERVER_PORT, metavar="PORT",
+                    help=f"serve the overlay on http://127.0.0.1:PORT/ with live updates (default port {DEFAULT_SERVER_PORT})")
+parser.add_argument("--stats", action="store_true", help="show a line of load/save/render timings, exportable as JSON")
+parser.add_argument("--lobby", action="append", metavar="NAME=FILE",
+                    help=f"edit lobby NAME, written to overlay FILE; repeat for several lobbies (default: {DEFAULT_LOBBY}={HTML_FILE})")
+parser.add_argument("--overall", default=OVERALL_FILE, metavar="FILE",
+                    help=f"overlay of all lobbies' teams by total points, written with several lobbies (default {OVERALL_FILE})")
+sharing_group = parser.add_mutually_exclusive_group()
+sharing_group.add_argument("--host", nargs="?", const=str(DEFAULT_SHARING_PORT), metavar="[ADDR:]PORT",
+                           help=f"let other operators join and edit this table (default 127.0.0.1:{DEFAULT_SHARING_PORT})")
+sharing_group.add_argument("--join", metavar="HOST:PORT", help="edit the table of an editor started with --host")
+parser.add_argument("--token", metavar="TOKEN",
+                    help="shared secret operators must give to join (--host), or that the host asked for (--join); "
+                         "needed to host on any address other than localhost")
+parser.add_argument("--watch", action="store_true", help="merge edits made to the overlay file(s) by hand or by other tools")
+args = parser.parse_args()
+try:
+    if args.host or args.join:
+        from sharing import parse_address # Pulls in asyncio; only needed with --host/--join
+    host_address = parse_address(args.host) if args.host else None
+    join_address = parse_address(args.join) if args.join else None
+    if (host_address or join_address) and len(args.lobby or ()) > 1:
+        raise StandingsError("--host and --join share a single lobby.")
+    lobby_args = [parse_lobby_arg(value) for value in args.lobby or [f"{DEFAULT_LOBBY}={HTML_FILE}"]]
+    lobby_set = LobbySet(lobby_args, args.overall, after_write=after_lobby_write)
+except StandingsError as e:
+    parser.error(str(e))
+
 root = tk.Tk()
 root.title("BGMI Tournament Editor")
 root.geometry("700x600")
@@ -395,16 +994,75 @@ root.geometry("700x600")
 status_label = tk.Label(root, text="Initializing...", fg="black", anchor="w")
 status_label.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
 
+# --- Optional Stats Line (--stats) ---
+if args.stats:
+    stats_frame = tk.Frame(root)
+    stats_frame.pack(side="bottom", fill="x", padx=10)
+    tk.Button(stats_frame, text="Export Stats", command=export_stats).pack(side="right")
+    stats_label = tk.Label(stats_frame, text="No timings yet.", fg="gray", anchor="w", font=("TkFixedFont", 8))
+    stats_label.pack(side="left", fill="x", expand=True)
+
 # --- Load initial data ---
-data, soup = load_data()
+with timer_without_dialogs("load"): # Not the time the user takes to read load warnings
+    if join_address:
+        # The host owns the data: load its table instead of any local files
+        joined_lobby = lobby_set.first()
+        joined_lobby.store, joined_lobby.renderer = Standings(), OverlayRenderer() # Renderer only for --serve
+        joined_lobby.store.on_listener_error = report_listener_error
+        from sharing import SharingClient
+        sharing = SharingClient(joined_lobby.store, *join_address, token=args.token)
+        try:
+            sharing.start()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Join Error", f"Could not join {sharing.address}: {e}")
+            root.destroy()
+            raise SystemExit(1)
+        status_label.config(text=f"Joined {sharing.address} ({len(joined_lobby.store)} teams). The host saves the overlay.", fg="blue")
+    else:
+        for each_lobby in lobby_set:
+            each_lobby.store, each_lobby.renderer = load_data(each_lobby)
+            each_lobby.store.on_listener_error = report_listener_error
+            each_lobby.journal.attach(each_lobby.store)
+            each_lobby.undo = UndoHistory(each_lobby.store)
+            each_lobby.timeline.attach(each_lobby.store)
+            show_load_warnings(each_lobby.timeline.warnings, "Timeline Warning")
+
+# --- Lobby / Search / Jump Frame ---
+search_frame = tk.Frame(root)
+search_frame.pack(pady=(5, 0), padx=10, fill="x")
+if len(lobby_set) > 1:
+    tk.Label(search_frame, text="Lobby:").pack(side="left")
+    lobby_var = tk.StringVar(value=lobby_set.first().name)
+    lobby_box = ttk.Combobox(search_frame, textvariable=lobby_var, values=list(lobby_set.lobbies), state="readonly", width=12)
+    lobby_box.pack(side="left", padx=(5, 15))
+    lobby_box.bind("<<ComboboxSelected>>", lambda event: show_lobby(lobby_var.get()))
+tk.Label(search_frame, text="Find team:").pack(side="left")
+search_var = tk.StringVar()
+search_entry = tk.Entry(search_frame, textvariable=search_var, width=25)
+search_entry.pack(side="left", padx=(5, 15))
+search_entry.bind("<Return>", find_team)
+search_var.trace_add("write", lambda *_: find_team()) # Jump to the first match while typing
+tk.Label(search_frame, text="Go to #:").pack(side="left")
+jump_var = tk.StringVar()
+jump_entry = tk.Entry(search_frame, textvariable=jump_var, width=8)
+jump_entry.pack(side="left", padx=5)
+jump_entry.bind("<Return>", jump_to_rank)
+rapid_var = tk.BooleanVar(value=False)
+tk.Checkbutton(search_frame, text="Rapid entry (F2)", variable=rapid_var, command=toggle_rapid_entry).pack(side="right")
+root.bind("<F2>", toggle_rapid_entry)
+root.bind("<Control-f>", lambda event: focus_field(search_entry))
+root.bind("<Control-g>", lambda event: focus_field(jump_entry))
+for entry in (search_entry, jump_entry):
+    entry.bind("<Escape>", lambda event: tree.focus_set())
 
 # --- Treeview Setup ---
 tree_frame = tk.Frame(root)
 tree_frame.pack(pady=(5, 0), padx=10, fill="both", expand=True)
 
 # Use '#' as the first column name now
-display_cols = ("#", "Team", "Points", "Status")
-tree = ttk.Treeview(tree_frame, columns=display_cols, show="headings")
+display_cols = COLUMNS
+ttk.Style().configure("Treeview", rowheight=ROW_HEIGHT)
+tree = ttk.Treeview(tree_frame, columns=display_cols, show="headings", selectmode="browse")
 
 col_widths = {"#": 60, "Team": 150, "Points": 70, "Status": 120}
 for col in display_cols:
@@ -412,13 +1070,28 @@ for col in display_cols:
     tree.heading(col, text=col, anchor="center", command=lambda _col=col: sort_column(tree, _col, False))
     tree.column(col, anchor="center", width=width, stretch=tk.NO if col != "Team" else tk.YES)
 
-vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+# The vertical scrollbar moves through order_view, not through Treeview items
+vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=scroll_view)
 hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=tree.xview)
-tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+tree.configure(xscrollcommand=hsb.set)
 vsb.pack(side="right", fill="y")
 hsb.pack(side="bottom", fill="x")
 tree.pack(side="left", fill="both", expand=True)
-tree.bind("<<TreeviewSelect>>", select_entry)
+tree.bind("<Button-1>", on_tree_click)
+tree.bind("<Configure>", lambda event: update_table()) # More or fewer rows now fit
+for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+    tree.bind(sequence, on_mouse_wheel)
+tree.bind("<Up>", lambda event: move_selection(-1))
+tree.bind("<Down>", lambda event: move_selection(1))
+tree.bind("<Prior>", lambda event: move_selection(-visible_row_count()))
+tree.bind("<Next>", lambda event: move_selection(visible_row_count()))
+tree.bind("<Home>", lambda event: move_selection(-len(order_view)))
+tree.bind("<End>", lambda event: move_selection(len(order_view)))
+for i in range(NUM_STATUS_INDICATORS): # Rapid entry keys, top row and keypad
+    for sequence in (f"<KeyPress-{i + 1}>", f"<KP_{i + 1}>"):
+        tree.bind(sequence, lambda event, i=i: rapid_toggle(i))
+for sequence in ("<KeyPress-0>", "<KP_0>"):
+    tree.bind(sequence, lambda event: rapid_toggle(None))
 
 # --- Entry Fields Frame ---
 entry_frame = tk.Frame(root)
@@ -461,15 +1134,37 @@ tk.Button(button_frame, text="Update Status", command=update_entry).pack(side="l
 tk.Button(button_frame, text="Delete Entry", command=delete_entry).pack(side="left", padx=5, expand=True)
 # Removed "Save Changes" Button
 # tk.Button(button_frame, text="Save Changes", command=perform_save, font=('Helvetica', 9, 'bold')).pack(side="left", padx=5, expand=True) # Manual save still possible if needed
+tk.Button(button_frame, text="Bulk Import", command=open_bulk_import).pack(side="left", padx=5, expand=True)
+tk.Button(button_frame, text="Match Results", command=open_match_results).pack(side="left", padx=5, expand=True)
 tk.Button(button_frame, text="Clear All", command=clear_all_data, bg="#FF5555", fg="white").pack(side="left", padx=5, expand=True)
+tk.Button(button_frame, text="Undo", command=undo_edit).pack(side="left", padx=5, expand=True)
+tk.Button(button_frame, text="Redo", command=lambda: undo_edit(redo=True)).pack(side="left", padx=5, expand=True)
+for sequence in ("<Control-z>", "<Control-Z>"):
+    root.bind(sequence, lambda event: undo_edit())
+for sequence in ("<Control-y>", "<Control-Y>", "<Control-Shift-z>", "<Control-Shift-Z>"):
+    root.bind(sequence, lambda event: undo_edit(redo=True))
 
 # --- Initial Population and Final Setup ---
-update_table()
-if data: # Apply initial sort only if data exists
+show_lobby(lobby_set.first().name)
+if store: # Apply initial sort only if data exists (this also populates the table)
     initial_col = sort_column_cache["column"]
     initial_rev = sort_column_cache["reverse"]
     sort_column(tree, initial_col, initial_rev)
 
 # --- Run ---
+if args.serve is not None:
+    start_push_server(args.serve)
+if host_address:
+    start_sharing_host(host_address)
+if args.watch and not join_address: # Joined operators have no files of their own
+    start_watching()
+
 root.protocol("WM_DELETE_WINDOW", on_closing)
+poll_save_results()
+if sharing:
+    poll_sharing()
+if lobby_set.first().watcher:
+    poll_external_edits()
+if args.stats:
+    refresh_stats_line()
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""CSV/JSON import of many teams at once, for Standings.apply_batch, and of
+match results for the scoring engine.
+
+Accepted CSV (or tab-separated text pasted from a spreadsheet), with or
+without a header row:
+
+    #,Team,Points,Status
+    1,GodLike,10,✅✅❌✅
+
+Accepted JSON: a list of [#, Team, Points, Status] lists, or of objects
+with "#"/"rank", "team"/"name", "points" and "status" keys, optionally
+wrapped as {"teams": [...]}.
+
+Points and Status may be left out to keep a team's current values. Status
+may be ✅/❌ or 🟩/🟥 emojis, a string of 1/0 digits ("1101"), or (in JSON)
+the status bitmask 0-15.
+"""
+
+import csv
+import io
+import json
+
+from standings import ALL_ALIVE, NUM_STATUS_INDICATORS, StandingsError, status_to_mask
+
+# Header names accepted for each column (compared case-insensitively)
+HEADER_ALIASES = {
+    "#": 0, "rank": 0,
+    "team": 1, "name": 1,
+    "points": 2, "pts": 2,
+    "status": 3,
+}
+
+
+def parse_status(value):
+    """Parses a status cell into a bitmask; None/empty means "keep current"."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise StandingsError(f"Status must be emojis, 1/0 digits or a number, got {value!r}.")
+    if isinstance(value, int):
+        if not 0 <= value <= ALL_ALIVE:
+            raise StandingsError(f"Status must be a number from 0 to {ALL_ALIVE}, got {value}.")
+        return value
+    value = str(value).strip()
+    if not value:
+        return None
+    if len(value) <= NUM_STATUS_INDICATORS and set(value) <= {"0", "1"}:
+        return sum(1 << i for i, bit in enumerate(value) if bit == "1")
+    return status_to_mask(value)
+
+
+def _parse_int(value, what, where):
+    if isinstance(value, bool): # JSON true/false would otherwise count as 1/0
+        raise StandingsError(f"{where}: {what} must be a number, got {value!r}.")
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise StandingsError(f"{where}: {what} must be a number, got {value!r}.")
+
+
+def _optional(value):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return value
+
+
+def _row(values, where):
+    """Normalises [#, Team, Points, Status] cells into an apply_batch row."""
+    values = list(values) + [None] * (4 - len(values))
+    rank = _parse_int(values[0], "#", where)
+    name = _optional(values[1])
+    points = _optional(values[2])
+    try:
+        status = parse_status(values[3])
+    except StandingsError as e:
+        raise StandingsError(f"{where}: {e}")
+    return (
+        rank,
+        None if name is None else str(name),
+        None if points is None else _parse_int(points, "Points", where),
+        status,
+    )
+
+
+def parse_csv(text):
+    """Parses CSV/TSV text into apply_batch rows."""
+    dialect = "excel-tab" if "\t" in text.split("\n", 1)[0] else "excel"
+    reader = csv.reader(io.StringIO(text.strip()), dialect)
+    columns = (0, 1, 2, 3)
+    rows = []
+    for line_no, cells in enumerate(reader, start=1):
+        if not any(cell.strip() for cell in cells):
+            continue
+        if line_no == 1 and cells[0].strip().lower() in HEADER_ALIASES:
+            mapped = [HEADER_ALIASES.get(cell.strip().lower()) for cell in cells]
+            if 0 not in mapped:
+                raise StandingsError("Line 1: header has no '#' column.")
+            columns = tuple(mapped.index(col) if col in mapped else None for col in range(4))
+            continue
+        values = [cells[col] if col is not None and col < len(cells) else None for col in columns]
+        rows.append(_row(values, f"Line {line_no}"))
+    return rows
+
+
+def parse_json(text):
+    """Parses JSON text into apply_batch rows."""
+    try:
+        items = json.loads(text)
+    except ValueError as e:
+        raise StandingsError(f"Invalid JSON: {e}")
+    if isinstance(items, dict):
+        items = items.get("teams", [])
+    if not isinstance(items, list):
+        raise StandingsError("JSON must be a list of teams.")
+    rows = []
+    for index, item in enumerate(items, start=1):
+        where = f"Team {index}"
+        if isinstance(item, dict):
+            cells = [None] * 4
+            for key, value in item.items():
+                col = HEADER_ALIASES.get(str(key).lower())
+                if col is not None:
+                    cells[col] = value
+            if cells[0] is None:
+                raise StandingsError(f"{where}: missing '#'.")
+            rows.append(_row(cells, where))
+        elif isinstance(item, list) and item:
+            rows.append(_row(item[:4], where))
+        else:
+            raise StandingsError(f"{where}: expected a list or an object.")
+    return rows
+
+
+def parse_import(text):
+    """Parses pasted or loaded text, detecting JSON vs CSV from its first character."""
+    stripped = text.lstrip()
+    if stripped.startswith(("[", "{")):
+        return parse_json(stripped)
+    return parse_csv(text)
+
+
+def read_import_file(path):
+    """Reads and parses a .json or .csv/.tsv/.txt standings file. Raises StandingsError if it cannot be read."""
+    try:
+        with open(path, "r", encoding="utf-8-sig") as file:
+            text = file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        raise StandingsError(f"Cannot read {path}: {e}")
+    return parse_import(text)
+
+
+def parse_match_results(text):
+    """Parses "Team,Placement,Kills" lines (CSV/TSV, optional header) for ScoringEngine.set_match."""
+    dialect = "excel-tab" if "\t" in text.split("\n", 1)[0] else "excel"
+    results = []
+    for line_no, cells in enumerate(csv.reader(io.StringIO(text.strip()), dialect), start=1):
+        if not any(cell.strip() for cell in cells):
+            continue
+        if line_no == 1 and cells[0].strip().lower() in ("team", "name"):
+            continue
+        if len(cells) < 2 or not cells[0].strip():
+            raise StandingsError(f"Line {line_no}: expected Team,Placement,Kills.")
+        where = f"Line {line_no}"
+        placement = _parse_int(cells[1], "Placement", where)
+        kills = _parse_int(cells[2], "Kills", where) if len(cells) > 2 and cells[2].strip() else 0
+        results.append((cells[0].strip(), placement, kills))
+    return results
@@ -0,0 +1,170 @@
+"""Append-only edit journal with snapshot compaction, for crash recovery.
+
+Every store edit is appended to the journal as one short JSON line and
+fsynced, so a persisted edit costs a few bytes instead of a full document
+rewrite. Every COMPACT_EVERY records the full state is written to a
+snapshot file and the journal starts over. On startup the snapshot plus the
+journal tail rebuild the exact state, without parsing BGMI.html.
+
+Journal lines:
+    ["epoch", N]                    header, first line of every journal
+    ["a", rank, name, points, mask] team added
+    ["u", rank, name, points, mask] team changed (full new values)
+    ["d", rank]                     team deleted
+    ["c"]                           all teams cleared
+    ["b", [[rank, name, points, mask], ...], [rank, ...]]
+                                    one batch: teams added/changed, then #s deleted
+
+A batch is a single line, so an interrupted write drops it completely
+rather than replaying half a transaction.
+
+The snapshot records the epoch of the journal that starts after it, so a
+crash between writing the snapshot and resetting the journal never replays
+old records twice.
+"""
+
+import json
+import os
+
+from standings import Standings, StandingsError
+from writer import write_atomic
+
+JOURNAL_FILE = "BGMI.journal"
+SNAPSHOT_FILE = "BGMI.snapshot.json"
+COMPACT_EVERY = 500 # Journal records between snapshots
+
+
+class JournalError(Exception):
+    """Raised when the snapshot cannot be read, so the journal cannot be trusted."""
+
+
+def _dumps(record):
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class Journal:
+    """Persists every change of a Standings store as it happens."""
+
+    def __init__(self, path=JOURNAL_FILE, snapshot_path=SNAPSHOT_FILE, compact_every=COMPACT_EVERY, fsync=True):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.warnings = [] # Problems found during the last recover()
+        self._epoch = 0
+        self._records = 0
+        self._file = None
+        self._store = None
+
+    def exists(self):
+        """True if there is saved state to recover."""
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.path)
+
+    # --- Recovery ---
+    def recover(self):
+        """Rebuilds the store from snapshot + journal tail. Returns a new Standings."""
+        self.warnings = []
+        store = Standings()
+        epoch = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as file:
+                    snapshot = json.load(file)
+                epoch = snapshot["epoch"]
+                for rank, name, points, status in snapshot["teams"]:
+                    store.add(rank, name, points, status)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                raise JournalError(f"Cannot read {self.snapshot_path}: {e}")
+        self._epoch = epoch
+
+        if not os.path.exists(self.path):
+            return store
+        with open(self.path, "rb") as file:
+            lines = file.read().split(b"\n")
+        if lines and lines[-1] == b"":
+            lines.pop()
+        for line_no, line in enumerate(lines, start=1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if line_no == len(lines):
+                    self.warnings.append(f"{self.path}: ignored incomplete last record (interrupted write).")
+                else:
+                    self.warnings.append(f"{self.path}: line {line_no} is corrupt; later edits were not recovered.")
+                break
+            if line_no == 1:
+                if record[:1] != ["epoch"] or record[1] < epoch:
+                    break # Journal was already folded into the snapshot
+                continue
+            try:
+                self._replay(store, record)
+            except (StandingsError, ValueError, IndexError, TypeError) as e:
+                self.warnings.append(f"{self.path}: line {line_no} could not be applied ({e}).")
+        return store
+
+    @staticmethod
+    def _replay(store, record):
+        op = record[0]
+        if op == "a":
+            store.add(*record[1:5])
+        elif op == "u":
+            rank, name, points, status = record[1:5]
+            store.update(rank, name=name, points=points, status=status)
+        elif op == "d":
+            store.delete(record[1])
+        elif op == "c":
+            store.clear()
+        elif op == "b":
+            store.apply_batch([tuple(row) for row in record[1]], deletes=record[2])
+        else:
+            raise ValueError(f"unknown record {op!r}")
+
+    # --- Recording ---
+    def attach(self, store):
+        """Starts journaling store: writes a fresh snapshot, then records every change."""
+        self._store = store
+        self.compact()
+        store.add_listener(self.record)
+
+    def record(self, change):
+        """Standings listener: appends one change to the journal."""
+        if change.op == "clear":
+            record = ["c"]
+        elif change.op == "batch":
+            record = ["b", [list(inner.after) for inner in change.after if inner.after is not None],
+                      [inner.rank for inner in change.after if inner.after is None]]
+        elif change.after is None:
+            record = ["d", change.rank]
+        else:
+            team = change.after
+            record = ["a" if change.op == "add" else "u", team.rank, team.name, team.points, team.status]
+        self._append(_dumps(record))
+        self._records += 1
+        if self._records >= self.compact_every:
+            self.compact()
+
+    def _append(self, data):
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def compact(self):
+        """Writes the whole store to the snapshot and starts a new, empty journal."""
+        self._epoch += 1
+        snapshot = {"epoch": self._epoch, "teams": [list(team) for team in self._store.snapshot()]}
+        write_atomic(self.snapshot_path, json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")))
+        if self._file:
+            self._file.close()
+        self._file = open(self.path, "wb")
+        self._append(_dumps(["epoch", self._epoch]))
+        self._records = 0
+
+    def close(self):
+        """Compacts (so the next start replays nothing) and closes the journal."""
+        if self._store is not None:
+            self._store.remove_listener(self.record)
+            self.compact()
+        if self._file:
+            self._file.close()
+            self._file = None
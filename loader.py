@@ -0,0 +1,189 @@
+"""Fast loading of the standings table from BGMI.html.
+
+Only the table is parsed, with precompiled regular expressions instead of
+building a BeautifulSoup tree of the whole page. BeautifulSoup is imported
+lazily, and only for odd documents the fast path cannot read. The parsed rows
+are cached in a sidecar file keyed by the HTML file's mtime and size, so an
+unchanged file is not parsed again at all. Once a journal exists the editor
+loads from it instead, and the cache (rewritten after every save) is what
+tells it whether the file was edited while it was closed, and how.
+
+Problems with individual rows do not stop loading: they are collected as
+warnings so the editor can show one summary.
+"""
+
+import html
+import json
+import os
+import re
+from collections import namedtuple
+
+from standings import NUM_STATUS_INDICATORS, Standings, StandingsError, status_to_mask
+from writer import write_atomic
+
+CACHE_SUFFIX = ".cache.json"
+CACHE_VERSION = 1
+
+# store: Standings; html_text: the page, for OverlayRenderer; source: "cache", "fast" or "bs4"
+LoadResult = namedtuple("LoadResult", ("store", "html_text", "warnings", "source"))
+
+_TABLE_RE = re.compile(r"<table\b[^>]*>(.*?)</table\s*>", re.IGNORECASE | re.DOTALL)
+_THEAD_RE = re.compile(r"<thead\b[^>]*>(.*?)</thead\s*>", re.IGNORECASE | re.DOTALL)
+_TBODY_RE = re.compile(r"<tbody\b[^>]*>(.*?)</tbody\s*>", re.IGNORECASE | re.DOTALL)
+_TR_RE = re.compile(r"<tr\b[^>]*>(.*?)</tr\s*>", re.IGNORECASE | re.DOTALL)
+_TH_RE = re.compile(r"<th\b[^>]*>(.*?)</th\s*>", re.IGNORECASE | re.DOTALL)
+_TD_RE = re.compile(r"<td\b[^>]*>(.*?)</td\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+class LoadError(Exception):
+    """Raised when the file has no usable standings table at all."""
+
+
+def cache_path_for(path):
+    return path + CACHE_SUFFIX
+
+
+def _cell_text(cell):
+    if "<" in cell:
+        cell = _TAG_RE.sub("", cell)
+    if "&" in cell:
+        cell = html.unescape(cell)
+    return cell.strip()
+
+
+def _check_header(header_cells):
+    if len(header_cells) < 4 or header_cells[0] not in ("#", "Rank"):
+        raise LoadError("Expected table headers '#', 'Team', 'Points', 'Status'. Found incomplete/wrong headers.")
+
+
+def _parse_rows(row_cells, path):
+    """Turns lists of cell texts into (rank, name, points, mask) rows plus warnings."""
+    rows, warnings = [], []
+    for i, cols in enumerate(row_cells, start=1):
+        if len(cols) < 4:
+            warnings.append(f"Row {i} in {path} has less than 4 columns (<td>). Skipping.")
+            continue
+        try:
+            rank_num = int(cols[0])
+            points = int(cols[2])
+        except ValueError:
+            warnings.append(f"Row {i} in {path} has non-numeric # or Points. Skipping.")
+            continue
+        status = cols[3]
+        if len(status) != NUM_STATUS_INDICATORS:
+            warnings.append(f"Row {i} (# {rank_num}) has status length {len(status)}, expected {NUM_STATUS_INDICATORS}. Adjusting.")
+        rows.append((rank_num, cols[1], points, status_to_mask(status))) # Missing indicators load as ❌
+    return rows, warnings
+
+
+def parse_fast(html_text, path="the file"):
+    """Parses the standings table with regular expressions. Returns (rows, warnings).
+
+    Returns None if the table has no <thead>/<tbody> to anchor on, so the
+    caller can fall back to parse_bs4.
+    """
+    table = _TABLE_RE.search(html_text)
+    if not table:
+        raise LoadError(f"No <table> tag found in {path}.")
+    thead = _THEAD_RE.search(table.group(1))
+    tbody = _TBODY_RE.search(table.group(1))
+    if not thead or not tbody:
+        return None
+    _check_header([_cell_text(cell) for cell in _TH_RE.findall(thead.group(1))])
+    row_cells = []
+    for row in _TR_RE.findall(tbody.group(1)):
+        cells = _TD_RE.findall(row)
+        if cells:
+            row_cells.append([_cell_text(cell) for cell in cells])
+    return _parse_rows(row_cells, path)
+
+
+def parse_bs4(html_text, path="the file"):
+    """Slow but forgiving parse with BeautifulSoup, for tables without <thead>/<tbody>."""
+    from bs4 import BeautifulSoup # Heavy; only imported when the fast path gives up
+    soup = BeautifulSoup(html_text, "html.parser")
+    table = soup.find("table")
+    if not table:
+        raise LoadError(f"No <table> tag found in {path}.")
+    header = table.find("thead") or table
+    _check_header([th.text.strip() for th in header.find_all("th")])
+    data_rows = (table.find("tbody") or table).find_all("tr")
+    # Skip a header row that sits among the data rows (no <thead>, or no <tbody>)
+    start_index = 1 if data_rows and data_rows[0].find("th") else 0
+    row_cells = [[td.text.strip() for td in row.find_all("td")] for row in data_rows[start_index:] if row.find("td")]
+    return _parse_rows(row_cells, path)
+
+
+def file_key(path, stat=None):
+    """The cache key of path: its mtime and size, from stat if given (e.g. as write_atomic returned it)."""
+    stat = stat or os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_cache(path, cache_path, check_file=True):
+    """Returns (rows, warnings) from the cache if it matches path's mtime and size, else None.
+
+    With check_file=False the rows last recorded are returned even if path
+    has changed since, e.g. as the base of a merge.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+        if cache.get("version") != CACHE_VERSION or (check_file and cache.get("file") != file_key(path)):
+            return None
+        return [tuple(row) for row in cache["teams"]], cache.get("warnings", [])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_cache(path, cache_path, rows, warnings=(), key=None):
+    """Records rows (tuples/TeamRows of rank, name, points, mask) as the parsed content of path.
+
+    key (see file_key) should be taken before path was read, or from the
+    write itself, so a change made in between invalidates the cache instead
+    of hiding behind it.
+    """
+    cache = {"version": CACHE_VERSION, "file": key or file_key(path), "teams": [list(row) for row in rows], "warnings": list(warnings)}
+    # Not fsynced: a cache lost in a crash only means one more parse and a more cautious merge
+    write_atomic(cache_path, json.dumps(cache, ensure_ascii=False, separators=(",", ":")), fsync=False)
+
+
+def load_file(path, cache_path=None):
+    """Loads standings from path, using and refreshing the sidecar cache. Returns a LoadResult.
+
+    Raises OSError if the file cannot be read and LoadError if it has no
+    usable table.
+    """
+    if cache_path is None:
+        cache_path = cache_path_for(path)
+    key = file_key(path)
+    with open(path, "r", encoding="utf-8") as file:
+        html_text = file.read()
+
+    cached = read_cache(path, cache_path)
+    if cached is not None:
+        rows, warnings = cached
+        source = "cache"
+    else:
+        parsed = parse_fast(html_text, path)
+        source = "fast"
+        if parsed is None:
+            parsed = parse_bs4(html_text, path)
+            source = "bs4"
+        rows, warnings = parsed
+
+    store = Standings()
+    warnings = list(warnings)
+    for rank, name, points, status in rows:
+        try:
+            store.add(rank, name, points, status)
+        except StandingsError as e:
+            warnings.append(f"# {rank} in {path}: {e} Skipping.")
+
+    if source != "cache":
+        try:
+            write_cache(path, cache_path, store.snapshot(), warnings, key)
+        except OSError:
+            pass # The cache is only an optimisation
+    return LoadResult(store, html_text, warnings, source)
@@ -0,0 +1,161 @@
+"""Several lobbies (groups) edited side by side, plus one overall table.
+
+Each lobby has its own standings, overlay file, journal, timeline and match
+results, named after its overlay file: lobby "A" in A.html journals to
+A.journal and A.snapshot.json and records its history in A.timeline, and
+the default lobby keeps the editor's usual BGMI.* files.
+All overlays, including the overall table, are written by OverlayWriters
+sharing one worker pool, so a slow write of one lobby (OBS holding the file,
+a slow disk) never holds up another lobby's overlay.
+
+The overall table lists every team of every lobby by total points; a team
+playing in several lobbies (e.g. one lobby per match day) has its points
+summed, and shows its status in the last lobby listing it.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from journal import Journal
+from loader import cache_path_for
+from render import OverlayRenderer
+from standings import StandingsError, TeamRow
+from timeline import Timeline
+from writer import OverlayWriter
+
+DEFAULT_LOBBY = "BGMI"
+OVERALL_FILE = "BGMI.overall.html"
+MAX_POOL_WORKERS = 8 # Up to this many overlays are written at the same time
+
+
+def parse_lobby_arg(value):
+    """Parses a --lobby "NAME=FILE" (or just "FILE", named after the file) argument into (name, path)."""
+    name, sep, path = value.partition("=")
+    if not sep:
+        name, path = os.path.splitext(os.path.basename(value))[0], value
+    name, path = name.strip(), path.strip()
+    if not name or not path:
+        raise StandingsError(f"Expected NAME=FILE for a lobby, got {value!r}.")
+    return name, path
+
+
+class Lobby:
+    """One lobby's overlay file and everything kept alongside it."""
+
+    def __init__(self, name, path, writer):
+        base = os.path.splitext(path)[0]
+        self.name = name
+        self.path = path
+        self.backup_path = path + ".bak"
+        self.cache_path = cache_path_for(path)
+        self.matches_path = base + ".matches.json"
+        self.journal = Journal(base + ".journal", base + ".snapshot.json")
+        self.timeline = Timeline(base + ".timeline")
+        self.writer = writer
+        self.store = None # Set once loaded
+        self.renderer = None
+        self.scoring_engine = None # Loaded on first use; needs NumPy
+        self.order_view = None # Created the first time the lobby is shown
+        self.search_index = None
+        self.watcher = None # watch.ExternalEditWatcher, with --watch
+        self.undo = None # undo.UndoHistory; joined operators have none
+        self.save_job = None # Pending Tk .after job of this lobby's auto-save
+        self.save_first_edit = 0.0 # time.monotonic() of the first edit that save covers
+
+    def __repr__(self):
+        return f"Lobby({self.name!r}, {self.path!r})"
+
+
+class LobbySet:
+    """The lobbies of an event, in the order given, and the overall table's writer."""
+
+    def __init__(self, lobbies, overall_path=OVERALL_FILE, after_write=None):
+        """lobbies: (name, path) pairs. after_write(lobby, snapshot, stat) runs after each lobby overlay write."""
+        names = [name.casefold() for name, _path in lobbies]
+        if not lobbies or len(set(names)) != len(names):
+            raise StandingsError("Lobby names must be given and unique.")
+        # Lobbies sharing a file (or its name without extension, which names the
+        # journal and the other files kept alongside it) would race on them
+        paths = [os.path.normcase(os.path.abspath(path)) for _name, path in lobbies]
+        bases = {os.path.splitext(path)[0] for path in paths}
+        overall = os.path.normcase(os.path.abspath(overall_path))
+        if len(bases) != len(paths) or (len(lobbies) > 1 and overall in paths):
+            raise StandingsError("Every lobby, and the overall table, needs a file of its own.")
+        workers = min(len(lobbies) + (len(lobbies) > 1), MAX_POOL_WORKERS)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="overlay-writer")
+        self.lobbies = {}
+        for name, path in lobbies:
+            hook = (lambda snapshot, stat, _name=name: after_write(self.lobbies[_name], snapshot, stat)) if after_write else None
+            self.lobbies[name] = Lobby(name, path, OverlayWriter(path, path + ".bak", hook, pool=self.pool))
+        self.overall_path = overall_path
+        self.overall_renderer = None
+        self.overall_writer = OverlayWriter(overall_path, pool=self.pool) if len(lobbies) > 1 else None
+        self._overall_generation = None
+
+    def __iter__(self):
+        return iter(self.lobbies.values())
+
+    def __len__(self):
+        return len(self.lobbies)
+
+    def __getitem__(self, name):
+        return self.lobbies[name]
+
+    def first(self):
+        return next(iter(self.lobbies.values()))
+
+    def writers(self):
+        """(label, OverlayWriter) for every overlay file, the overall table last."""
+        pairs = [(lobby.name, lobby.writer) for lobby in self]
+        if self.overall_writer:
+            pairs.append(("Overall", self.overall_writer))
+        return pairs
+
+    # --- Overall Table ---
+    def overall_rows(self):
+        """TeamRows of the overall table: every team by total points, then name."""
+        totals = {}
+        for lobby in self:
+            for team in lobby.store or ():
+                key = team.name.casefold()
+                entry = totals.get(key)
+                if entry is None:
+                    totals[key] = [team.name, team.points, team.status]
+                else:
+                    entry[1] += team.points
+                    entry[2] = team.status
+        ordered = sorted(totals.values(), key=lambda entry: (-entry[1], entry[0].casefold()))
+        return tuple(TeamRow(rank, name, points, status) for rank, (name, points, status) in enumerate(ordered, start=1))
+
+    def _overall_template(self):
+        if self.overall_renderer is None:
+            try:
+                self.overall_renderer = OverlayRenderer.from_file(self.overall_path)
+            except (OSError, UnicodeDecodeError):
+                self.overall_renderer = self.first().renderer or OverlayRenderer()
+        return self.overall_renderer
+
+    # --- Saving ---
+    def save(self, names=None):
+        """Queues every lobby (or those named) with unsaved edits, and the overall table if any lobby changed.
+
+        Returns the names of the overlays queued ("Overall" for the overall table).
+        """
+        queued = [lobby.name for lobby in self if (names is None or lobby.name in names) and lobby.store is not None
+                  and lobby.renderer and lobby.writer.save(lobby.renderer, lobby.store)]
+        if self.overall_writer:
+            generation = tuple(lobby.store.generation if lobby.store is not None else None for lobby in self)
+            if generation != self._overall_generation:
+                self._overall_generation = generation
+                self.overall_writer.submit(self._overall_template(), self.overall_rows())
+                queued.append("Overall")
+        return queued
+
+    def flush(self, timeout=None):
+        return all([writer.flush(timeout) for _label, writer in self.writers()])
+
+    def close(self):
+        """Writes everything still pending, then stops the worker pool."""
+        for _label, writer in self.writers():
+            writer.close()
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,108 @@
+"""Timing and counter hooks for the editor's hot paths.
+
+Timings are kept as a bounded window of recent samples per operation, so
+percentiles reflect the current match rather than the whole day. Safe to
+use from the background writer thread as well as the Tk thread.
+
+    with metrics.timer("render"):
+        ...
+    metrics.count("saves.skipped")
+    metrics.summary_line()  # "save p50 0.4ms p95 1.2ms | ..."
+    metrics.export_json("stats.json")
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SAMPLES = 2000 # Recent samples kept per operation
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list (fraction in 0..1)."""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, math.ceil(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+class Metrics:
+    """Per-operation latency samples and named counters."""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._totals = {} # name -> [calls, total seconds]; not windowed
+        self._counters = {}
+
+    def record(self, name, seconds):
+        """Adds one timing sample for operation `name`."""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+                self._totals[name] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+    def stats(self, name):
+        """Returns {"calls", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"} for one operation."""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+            calls, total = self._totals.get(name, (0, 0.0))
+        return {
+            "calls": calls,
+            "mean_ms": total * 1000 / calls if calls else 0.0,
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "max_ms": (samples[-1] if samples else 0.0) * 1000,
+        }
+
+    def to_dict(self):
+        with self._lock:
+            names = list(self._samples)
+            counters = dict(self._counters)
+        return {"timings": {name: self.stats(name) for name in names}, "counters": counters}
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def summary_line(self, names=None):
+        """One-line summary of p50/p95 per operation, for the editor's stats line."""
+        with self._lock:
+            names = [name for name in (names or self._samples) if name in self._samples]
+        parts = []
+        for name in names:
+            stats = self.stats(name)
+            parts.append(f"{name} p50 {stats['p50_ms']:.1f}ms p95 {stats['p95_ms']:.1f}ms ({stats['calls']})")
+        return " | ".join(parts) or "No timings yet."
+
+
+# Shared instance used by the editor and its background threads
+metrics = Metrics()
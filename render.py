@@ -0,0 +1,98 @@
+"""Fast HTML renderer for the OBS overlay (BGMI.html).
+
+The overlay document is split once into a static prefix and suffix around
+the <tbody>. Each save then only formats the table rows from a string
+template, instead of rebuilding and prettifying the whole document.
+"""
+
+import re
+
+from standings import NUM_STATUS_INDICATORS, ALL_ALIVE
+
+DEFAULT_HTML = "<html><head><title>Standings</title></head><body><table><thead><tr><th>#</th><th>Team</th><th>Points</th><th>Status</th></tr></thead><tbody></tbody></table></body></html>"
+HEADER_ROW = "<thead><tr><th>#</th><th>Team</th><th>Points</th><th>Status</th></tr></thead>"
+ROW_TEMPLATE = "    <tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>\n"
+
+# Overlay status cell for every bitmask (🟩 = alive, 🟥 = eliminated).
+OVERLAY_STATUS = tuple(
+    "".join("🟩" if mask & (1 << i) else "🟥" for i in range(NUM_STATUS_INDICATORS))
+    for mask in range(ALL_ALIVE + 1)
+)
+
+_H1_RE = re.compile(r"<h1\b.*?</h1\s*>\s*", re.IGNORECASE | re.DOTALL)
+_TABLE_RE = re.compile(r"<table\b[^>]*>(.*?)</table\s*>", re.IGNORECASE | re.DOTALL)
+_TBODY_RE = re.compile(r"(<tbody\b[^>]*>).*?(</tbody\s*>)", re.IGNORECASE | re.DOTALL)
+_THEAD_RE = re.compile(r"<thead\b.*?</thead\s*>", re.IGNORECASE | re.DOTALL)
+_META_REFRESH_RE = re.compile(r"<meta\b[^>]*http-equiv=[\"']?refresh[\"']?[^>]*>\s*", re.IGNORECASE)
+_BODY_CLOSE_RE = re.compile(r"</body\s*>", re.IGNORECASE)
+_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def escape_text(text):
+    """Escapes a cell's text; names without markup characters are returned as-is."""
+    if "&" in text or "<" in text or ">" in text:
+        return text.translate(_ESCAPES)
+    return text
+
+
+def split_document(html_text):
+    """Splits an overlay document into (prefix, suffix) around the table body.
+
+    The <h1> title is dropped, as the editor has always done on save. A table
+    without <thead>/<tbody> gets standard ones; its old rows are discarded
+    since the store is the source of truth. A document without a <table>
+    falls back to DEFAULT_HTML.
+    """
+    html_text = _H1_RE.sub("", html_text)
+    table = _TABLE_RE.search(html_text)
+    if not table:
+        html_text = DEFAULT_HTML
+        table = _TABLE_RE.search(html_text)
+
+    tbody = _TBODY_RE.search(html_text, table.start(), table.end())
+    if tbody:
+        return html_text[:tbody.end(1)] + "\n", "   " + html_text[tbody.start(2):]
+
+    # No <tbody>: keep the table tag and any <thead>, rebuild the rest of the table.
+    open_end = table.start(1)
+    thead = _THEAD_RE.search(html_text, open_end, table.end(1))
+    head = thead.group(0) if thead else HEADER_ROW
+    prefix = html_text[:open_end] + head + "<tbody>\n"
+    suffix = "</tbody>" + html_text[table.end(1):]
+    return prefix, suffix
+
+
+class OverlayRenderer:
+    """Renders standings into the overlay document from a cached prefix/suffix."""
+
+    def __init__(self, html_text=DEFAULT_HTML):
+        self.prefix, self.suffix = split_document(html_text)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as file:
+            return cls(file.read())
+
+    def live(self, script):
+        """Returns a copy without the meta refresh that runs `script` instead.
+
+        Used by the push server: the page loads once and patches its own rows.
+        """
+        live = OverlayRenderer.__new__(OverlayRenderer)
+        live.prefix = _META_REFRESH_RE.sub("", self.prefix)
+        tag = f"<script>{script}</script>\n"
+        body_close = _BODY_CLOSE_RE.search(self.suffix)
+        if body_close:
+            live.suffix = self.suffix[:body_close.start()] + tag + self.suffix[body_close.start():]
+        else:
+            live.suffix = self.suffix + tag
+        return live
+
+    def render_rows(self, teams):
+        """Returns the <tbody> contents for teams, in the order given."""
+        row = ROW_TEMPLATE.format
+        return "".join([row(t.rank, escape_text(t.name), t.points, OVERLAY_STATUS[t.status]) for t in teams])
+
+    def render(self, teams):
+        """Returns the complete overlay document for teams, in the order given."""
+        return self.prefix + self.render_rows(teams) + self.suffix
@@ -0,0 +1,250 @@
+"""Vectorized scoring engine: Points and # computed from per-match results.
+
+Each match result is a team's placement (1 = chicken dinner, 0 = did not
+play) and its kills. Results are kept in (matches x teams) NumPy arrays, so
+totals for a whole league are a few array operations. Changing one match
+only applies the difference to the running totals before re-ranking.
+
+Ranking order (highest first): total points, chicken dinners, placement
+points, kills, then the better placement in the team's most recent match.
+
+Requires NumPy (pip install numpy); the rest of the editor does not.
+"""
+
+import copy
+
+import numpy as np
+
+from standings import StandingsError
+
+# BGMI/PUBG Mobile esports table: points for 1st..8th place, 0 below that.
+DEFAULT_PLACEMENT_POINTS = (10, 6, 5, 4, 3, 2, 1, 1)
+DEFAULT_KILL_POINTS = 1
+MAX_PLACEMENT = 100 # Solo lobbies have up to 100 placements
+
+
+def _key(name):
+    return name.strip().casefold()
+
+
+class ScoringEngine:
+    """Per-match placements and kills for a set of teams, with cumulative standings."""
+
+    def __init__(self, placement_points=DEFAULT_PLACEMENT_POINTS, kill_points=DEFAULT_KILL_POINTS, teams=()):
+        if len(placement_points) > MAX_PLACEMENT:
+            raise StandingsError(f"At most {MAX_PLACEMENT} placement points can be configured.")
+        self.placement_points = tuple(placement_points)
+        self.kill_points = kill_points
+        # Index 0 is "did not play" and scores nothing
+        self._table = np.zeros(MAX_PLACEMENT + 1, dtype=np.int32)
+        self._table[1:len(placement_points) + 1] = placement_points
+        self.teams = [] # Team names, in column order
+        self._columns = {}
+        self.num_matches = 0
+        self._placements = np.zeros((8, 32), dtype=np.int16)
+        self._kills = np.zeros((8, 32), dtype=np.int32)
+        # Running totals per team, updated by difference on every change
+        self._placement_totals = np.zeros(32, dtype=np.int64)
+        self._kill_totals = np.zeros(32, dtype=np.int64)
+        self._wins = np.zeros(32, dtype=np.int64)
+        for name in teams:
+            self.add_team(name)
+
+    # --- Teams and Capacity ---
+    def _grow(self, matches, teams):
+        """Reallocates the arrays (doubling) so they hold at least matches x teams."""
+        rows, cols = self._placements.shape
+        if matches <= rows and teams <= cols:
+            return
+        new_rows = max(rows, 1)
+        while new_rows < matches:
+            new_rows *= 2
+        new_cols = max(cols, 1)
+        while new_cols < teams:
+            new_cols *= 2
+        for attr in ("_placements", "_kills"):
+            old = getattr(self, attr)
+            grown = np.zeros((new_rows, new_cols), dtype=old.dtype)
+            grown[:rows, :cols] = old
+            setattr(self, attr, grown)
+        for attr in ("_placement_totals", "_kill_totals", "_wins"):
+            old = getattr(self, attr)
+            grown = np.zeros(new_cols, dtype=old.dtype)
+            grown[:cols] = old
+            setattr(self, attr, grown)
+
+    def add_team(self, name):
+        """Registers a team (no-op if known) and returns its column."""
+        key = _key(name)
+        if key not in self._columns:
+            self._grow(self.num_matches, len(self.teams) + 1)
+            self._columns[key] = len(self.teams)
+            self.teams.append(name.strip())
+        return self._columns[key]
+
+    def column(self, name):
+        column = self._columns.get(_key(name))
+        if column is None:
+            raise StandingsError(f"Team '{name}' has no results.")
+        return column
+
+    # --- Results ---
+    def _check(self, placement, kills):
+        if not 0 <= placement <= MAX_PLACEMENT:
+            raise StandingsError(f"Placement must be between 1 and {MAX_PLACEMENT} (0 = did not play).")
+        if kills < 0 or (placement == 0 and kills):
+            raise StandingsError("Kills must be 0 or more, and 0 for a team that did not play.")
+
+    def _apply_delta(self, match, columns, placements, kills):
+        """Replaces results in one match row, updating the totals by difference."""
+        old_placements = self._placements[match, columns].astype(np.int64)
+        old_kills = self._kills[match, columns].astype(np.int64)
+        placements = np.asarray(placements, dtype=np.int64)
+        kills = np.asarray(kills, dtype=np.int64)
+        np.add.at(self._placement_totals, columns, self._table[placements] - self._table[old_placements])
+        np.add.at(self._kill_totals, columns, kills - old_kills)
+        np.add.at(self._wins, columns, (placements == 1).astype(np.int64) - (old_placements == 1))
+        self._placements[match, columns] = placements
+        self._kills[match, columns] = kills
+
+    def set_match(self, match, results):
+        """Replaces every result of match (0-based) with results: (team, placement, kills) tuples.
+
+        Teams not listed did not play that match.
+        """
+        results = list(results)
+        seen_teams, seen_placements = set(), set()
+        for team, placement, kills in results:
+            self._check(placement, kills)
+            if _key(team) in seen_teams:
+                raise StandingsError(f"Match {match + 1}: {team} is listed twice.")
+            if placement and placement in seen_placements:
+                raise StandingsError(f"Match {match + 1}: placement {placement} is listed twice.")
+            seen_teams.add(_key(team))
+            seen_placements.add(placement)
+        columns = [self.add_team(team) for team, _placement, _kills in results]
+        if match >= self.num_matches:
+            self._grow(match + 1, len(self.teams))
+            self.num_matches = match + 1
+        placements = np.zeros(len(self.teams), dtype=np.int64)
+        kills = np.zeros(len(self.teams), dtype=np.int64)
+        placements[columns] = [placement for _team, placement, _kills in results]
+        kills[columns] = [team_kills for _team, _placement, team_kills in results]
+        self._apply_delta(match, np.arange(len(self.teams)), placements, kills)
+
+    def recompute(self):
+        """Rebuilds the running totals from the result arrays in one vectorized pass."""
+        teams, matches = len(self.teams), self.num_matches
+        placements = self._placements[:matches, :teams]
+        self._placement_totals[:teams] = self._table[placements].sum(axis=0)
+        self._kill_totals[:teams] = self._kills[:matches, :teams].sum(axis=0)
+        self._wins[:teams] = (placements == 1).sum(axis=0)
+
+    # --- Standings ---
+    def points(self):
+        """Total points per team, in column order."""
+        teams = len(self.teams)
+        return self._placement_totals[:teams] + self.kill_points * self._kill_totals[:teams]
+
+    def _last_placement(self):
+        """Placement in each team's most recent match played (MAX_PLACEMENT + 1 if none)."""
+        teams, matches = len(self.teams), self.num_matches
+        if not matches:
+            return np.full(teams, MAX_PLACEMENT + 1)
+        played = self._placements[:matches, :teams] > 0
+        last = matches - 1 - np.argmax(played[::-1], axis=0)
+        placement = self._placements[last, np.arange(teams)].astype(np.int64)
+        placement[~played.any(axis=0)] = MAX_PLACEMENT + 1
+        return placement
+
+    def order(self):
+        """Team columns from 1st to last, applying the tie-breakers."""
+        teams = len(self.teams)
+        return np.lexsort((
+            np.arange(teams), # Registration order as the final, stable tie-breaker
+            self._last_placement(),
+            -self._kill_totals[:teams],
+            -self._placement_totals[:teams],
+            -self._wins[:teams],
+            -self.points(),
+        ))
+
+    def ranking(self):
+        """Returns [(#, team, points, wins, placement points, kills)] from 1st to last."""
+        points = self.points()
+        return [
+            (rank, self.teams[col], int(points[col]), int(self._wins[col]), int(self._placement_totals[col]), int(self._kill_totals[col]))
+            for rank, col in enumerate(self.order().tolist(), start=1)
+        ]
+
+    def standings_rows(self, store):
+        """Rows for Standings.apply_batch(replace=True): every team in store at its new #
+        with its total points. Status stays with the team, not with the #. Teams with
+        results that are no longer in store (deleted or renamed) are left out."""
+        for team in store:
+            self.add_team(team.name) # Teams without results still get ranked
+        rows = []
+        for _rank, name, points, *_tiebreaks in self.ranking():
+            team = store.find(name)
+            if team is not None:
+                rows.append((len(rows) + 1, team.name, points, team.status))
+        return rows
+
+    def missing_teams(self, store):
+        """Names of teams with results that are not in store, e.g. deleted or renamed since."""
+        played = (self._placements[:self.num_matches, :len(self.teams)] > 0).any(axis=0)
+        return [name for column, name in enumerate(self.teams) if played[column] and store.find(name) is None]
+
+    def with_match(self, match, results, store):
+        """Returns (engine, rows): a copy of this engine with match set from results, and
+        its standings_rows(store). This engine is not changed, so a batch the store
+        rejects leaves it in step with its saved file.
+
+        Every result team must be in store; results take the store's spelling of the name.
+        """
+        unknown = [team for team, _placement, _kills in results if store.find(team) is None]
+        if unknown:
+            shown = ", ".join(unknown[:10]) + (f" and {len(unknown) - 10} more" if len(unknown) > 10 else "")
+            raise StandingsError(f"Not in the table: {shown}. Check the spelling, or add the team first.")
+        engine = self.copy()
+        engine.set_match(match, [(store.find(team).name, placement, kills) for team, placement, kills in results])
+        return engine, engine.standings_rows(store)
+
+    # --- Persistence ---
+    def copy(self):
+        """An independent copy: its results can be changed without touching this engine."""
+        engine = copy.copy(self)
+        engine.teams = list(self.teams)
+        engine._columns = dict(self._columns)
+        for attr in ("_placements", "_kills", "_placement_totals", "_kill_totals", "_wins"):
+            setattr(engine, attr, getattr(self, attr).copy())
+        return engine
+
+    def to_dict(self):
+        teams, matches = len(self.teams), self.num_matches
+        return {
+            "placement_points": list(self.placement_points),
+            "kill_points": self.kill_points,
+            "teams": list(self.teams),
+            "placements": self._placements[:matches, :teams].tolist(),
+            "kills": self._kills[:matches, :teams].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuilds an engine saved with to_dict(). Raises ValueError if data is malformed."""
+        if not isinstance(data, dict) or not all(isinstance(name, str) for name in data.get("teams", ())):
+            raise ValueError("not saved match results")
+        engine = cls(data.get("placement_points", DEFAULT_PLACEMENT_POINTS), data.get("kill_points", DEFAULT_KILL_POINTS), data.get("teams", ()))
+        # Shape given explicitly: with no teams, the size alone cannot tell how many matches there are
+        shape = (len(data.get("placements", [])), len(engine.teams))
+        placements = np.asarray(data.get("placements", []), dtype=np.int16).reshape(shape)
+        kills = np.asarray(data.get("kills", []), dtype=np.int32).reshape(shape)
+        if ((placements < 0) | (placements > MAX_PLACEMENT) | (kills < 0)).any():
+            raise ValueError("placement or kills out of range")
+        engine.num_matches = len(placements)
+        engine._grow(engine.num_matches, len(engine.teams))
+        engine._placements[:engine.num_matches, :len(engine.teams)] = placements
+        engine._kills[:engine.num_matches, :len(engine.teams)] = kills
+        engine.recompute()
+        return engine
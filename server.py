@@ -0,0 +1,261 @@
+"""Local push server for the OBS overlay.
+
+Serves the standings page over HTTP and pushes row-level changes to every
+open page over Server-Sent Events, so the browser source updates without the
+3-second meta refresh (no reload, no font re-fetch, no flicker).
+
+Endpoints:
+    GET /        the standings page (no meta refresh, patches itself)
+    GET /events  SSE stream; "rows" events carry {"reset", "upsert", "delete"},
+                 a "reload" event asks the page to reload (new page template)
+    GET /state   the current rows as JSON
+
+The server runs its own asyncio loop on a background thread. publish() and
+reset() may be called from any thread; it only listens on localhost by default.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+from metrics import metrics
+from render import OVERLAY_STATUS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+KEEPALIVE_SECONDS = 15 # Comment line sent on idle streams so proxies/OBS keep them open
+
+# Runs in the overlay page. Rows are kept sorted by #; each "rows" event
+# either replaces the whole body (reset) or patches individual rows.
+CLIENT_SCRIPT = """
+(function () {
+  var tbody = document.querySelector("table tbody");
+  var rows = {};
+  Array.prototype.forEach.call(tbody.rows, function (tr) { rows[tr.cells[0].textContent.trim()] = tr; });
+  function upsert(values) {
+    var key = String(values[0]), tr = rows[key];
+    if (!tr) {
+      tr = document.createElement("tr");
+      for (var i = 0; i < 4; i++) tr.appendChild(document.createElement("td"));
+      var next = null;
+      for (var j = 0; j < tbody.rows.length; j++) {
+        if (Number(tbody.rows[j].cells[0].textContent) > values[0]) { next = tbody.rows[j]; break; }
+      }
+      tbody.insertBefore(tr, next);
+      rows[key] = tr;
+    }
+    for (var k = 0; k < 4; k++) {
+      if (tr.cells[k].textContent !== String(values[k])) tr.cells[k].textContent = values[k];
+    }
+  }
+  function remove(rank) {
+    var tr = rows[rank];
+    if (tr) { tr.parentNode.removeChild(tr); delete rows[rank]; }
+  }
+  var source = new EventSource("/events");
+  source.addEventListener("rows", function (event) {
+    var delta = JSON.parse(event.data);
+    if (delta.reset) { while (tbody.firstChild) tbody.removeChild(tbody.firstChild); rows = {}; }
+    delta["delete"].forEach(remove);
+    delta.upsert.forEach(upsert);
+  });
+  source.addEventListener("reload", function () { window.location.reload(); });
+})();
+"""
+
+
+def row_payload(team):
+    """JSON-ready [#, Team, Points, Status] for a TeamRow, with overlay emojis."""
+    return [team.rank, team.name, team.points, OVERLAY_STATUS[team.status]]
+
+
+class PushServer:
+    """Serves the overlay and streams store changes to connected pages."""
+
+    def __init__(self, renderer, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._page_renderer = renderer.live(CLIENT_SCRIPT)
+        self._rows = {} # rank -> TeamRow; only touched on the loop thread
+        self._clients = set()
+        self._pending_upserts = {}
+        self._pending_deletes = set()
+        self._pending_reset = False
+        self._flush_scheduled = False
+        self._marks = [] # (metric name, start) to record at the next flush
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_error = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    # --- Thread-safe API ---
+    def start(self, snapshot=()):
+        """Starts serving snapshot (a tuple of TeamRows). Raises OSError if the port is taken."""
+        self._rows = {team.rank: team for team in snapshot}
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), name="overlay-push-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error:
+            raise self._start_error
+
+    def stop(self, timeout=5):
+        if self._loop and self._stopping:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join(timeout)
+
+    def publish(self, change):
+        """Forwards a standings.Change to connected pages. Usable as a Standings listener."""
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._apply, change)
+
+    def mark(self, name, started):
+        """Records metric `name` from `started` (a time.perf_counter()) until the changes published so far reach the pages."""
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._add_mark, name, started)
+
+    def reset(self, snapshot, renderer=None):
+        """Replaces every row (and optionally the page template), e.g. after a reload."""
+        if self._loop:
+            page_renderer = renderer.live(CLIENT_SCRIPT) if renderer else None
+            self._loop.call_soon_threadsafe(self._apply_reset, tuple(snapshot), page_renderer)
+
+    # --- Loop Thread ---
+    def _apply(self, change):
+        if change.op == "clear":
+            self._apply_reset((), None)
+            return
+        if change.op == "batch":
+            for inner in change.after:
+                self._apply(inner)
+            return
+        if change.after is None:
+            self._rows.pop(change.rank, None)
+            self._pending_upserts.pop(change.rank, None)
+            self._pending_deletes.add(change.rank)
+        else:
+            self._rows[change.rank] = change.after
+            self._pending_deletes.discard(change.rank)
+            self._pending_upserts[change.rank] = change.after
+        self._schedule_flush()
+
+    def _apply_reset(self, snapshot, page_renderer):
+        if page_renderer:
+            self._page_renderer = page_renderer
+            for client in self._clients:
+                client.put_nowait(b"event: reload\ndata: {}\n\n") # Open pages fetch the new markup
+        self._rows = {team.rank: team for team in snapshot}
+        self._pending_upserts = dict(self._rows)
+        self._pending_deletes.clear()
+        self._pending_reset = True
+        self._schedule_flush()
+
+    def _add_mark(self, name, started):
+        self._marks.append((name, started))
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        # Changes made in one burst (e.g. a batch edit) go out as one event
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if self._pending_reset or self._pending_upserts or self._pending_deletes:
+            message = self._event(self._pending_reset, self._pending_upserts.values(), self._pending_deletes)
+            self._pending_upserts = {}
+            self._pending_deletes = set()
+            self._pending_reset = False
+            for client in self._clients:
+                client.put_nowait(message)
+        sent = time.perf_counter()
+        for name, started in self._marks:
+            metrics.record(name, sent - started)
+        self._marks = []
+
+    def _event(self, reset, upserts, deletes):
+        delta = {
+            "reset": reset,
+            "upsert": [row_payload(team) for team in sorted(upserts)],
+            "delete": sorted(deletes),
+        }
+        return f"event: rows\ndata: {json.dumps(delta, ensure_ascii=False)}\n\n".encode("utf-8")
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            self._start_error = e
+            self._ready.set()
+            return
+        if self.port == 0: # Ephemeral port requested; report the real one
+            self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await self._stopping.wait()
+            for client in self._clients:
+                client.put_nowait(None) # Ends each open event stream
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass # Headers are not needed
+            if len(request_line) < 2 or request_line[0] != "GET":
+                await self._respond(writer, "405 Method Not Allowed", "text/plain", b"Method Not Allowed")
+                return
+            path = request_line[1].split("?", 1)[0]
+            if path in ("/", "/index.html", "/BGMI.html"):
+                teams = [self._rows[rank] for rank in sorted(self._rows)]
+                await self._respond(writer, "200 OK", "text/html; charset=utf-8", self._page_renderer.render(teams).encode("utf-8"))
+            elif path == "/state":
+                state = [row_payload(self._rows[rank]) for rank in sorted(self._rows)]
+                await self._respond(writer, "200 OK", "application/json", json.dumps(state, ensure_ascii=False).encode("utf-8"))
+            elif path == "/events":
+                await self._stream(writer)
+            else:
+                await self._respond(writer, "404 Not Found", "text/plain", b"Not Found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # Client went away
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, body):
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            "Cache-Control: no-cache\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer):
+        # Registered before the table is sent: changes published while it is
+        # still being written queue up for this page instead of being lost
+        client = asyncio.Queue()
+        self._clients.add(client)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\n\r\n"
+            )
+            # A (re)connecting page always starts from the full table
+            writer.write(self._event(True, self._rows.values(), ()))
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(client.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    message = b": keepalive\n\n"
+                if message is None:
+                    return
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self._clients.discard(client)
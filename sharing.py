@@ -0,0 +1,423 @@
+"""Several operators editing the same standings at once.
+
+One editor is the host (bgmi.py --host): it owns the store, the journal and
+the overlay file. Other editors join it (bgmi.py --join HOST:PORT) over a
+TCP socket, keep a replica of the table, and send their edits to the host
+instead of writing any files.
+
+Every row has a version, bumped each time the row changes. An edit names
+the version of the row it was based on; the host applies it only if the row
+is still at that version (optimistic concurrency) and otherwise answers
+with a conflict carrying the current row. Edits to different rows never
+conflict, so operators working on different teams all keep their edits,
+rather than the last full-file save winning. Every applied change is sent
+to all operators as it happens.
+
+The host listens on localhost unless told otherwise. The protocol has no
+encryption, but an operator must first send the host's shared token (if
+it has one), and a host listening on any other address must have one.
+
+Protocol, one JSON object per line:
+    operator -> host
+        {"op": "hello", "token": T}  first line; T is null if the host has no token
+            a wrong token is answered with an error and the connection closed
+        {"op": "edit", "id": N, "rank": #, "version": V, "name"?, "points"?, "status"?}
+            version 0 adds a new team at #
+        {"op": "delete", "id": N, "rank": #, "version": V}
+        {"op": "toggle", "id": N, "rank": #, "indicator": I}
+            flips player I (0-3) of the row's status as the host has it now
+        {"op": "eliminate", "id": N, "rank": #}
+            all players of # down
+            Neither needs a version: they apply to the host's current
+            status, so quick keypresses (rapid entry) never conflict.
+    host -> operator
+        {"type": "state", "rows": [[#, name, points, mask, version], ...]}  after the hello
+        {"type": "rows", "upsert": [[#, name, points, mask, version], ...], "delete": [#, ...]}
+        {"type": "ack", "id": N, "rank": #, "version": V}
+        {"type": "conflict", "id": N, "rank": #, "row": [...] or null, "message": ...}
+        {"type": "error", "id": N, "message": ...}
+
+The store is only ever touched on the thread that calls process() (the Tk
+thread); the sockets are served from background threads.
+"""
+
+import asyncio
+import hmac
+import ipaddress
+import itertools
+import json
+import queue
+import socket
+import threading
+
+from standings import ALL_ALIVE, StandingsError, toggle_indicator
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+CONNECT_TIMEOUT = 5 # Seconds to wait for the host's initial state
+HELLO_TIMEOUT = 10 # Seconds an operator has to send its hello before the host hangs up
+OPERATIONS = ("edit", "delete", "toggle", "eliminate")
+
+
+def _dumps(message):
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def parse_address(value, default_host=DEFAULT_HOST):
+    """Parses "HOST:PORT", ":PORT" or "PORT" into (host, port)."""
+    host, sep, port = value.rpartition(":")
+    try:
+        return (host if sep and host else default_host), int(port)
+    except ValueError:
+        raise StandingsError(f"Expected HOST:PORT, got {value!r}.")
+
+
+def is_loopback(host):
+    """True if host only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _edit_fields(request):
+    """The name/points/status of an edit request, checked: operators' requests come from the network."""
+    fields = {field: request[field] for field in ("name", "points", "status") if request.get(field) is not None}
+    if "name" in fields and not isinstance(fields["name"], str):
+        raise StandingsError("Team name must be text.")
+    if "points" in fields and not _is_int(fields["points"]):
+        raise StandingsError("Points must be a number.")
+    if "status" in fields and not (_is_int(fields["status"]) and 0 <= fields["status"] <= ALL_ALIVE):
+        raise StandingsError(f"Status must be a number from 0 to {ALL_ALIVE}.")
+    return fields
+
+
+class SharingHost:
+    """Owns the store: applies operators' edits with per-row version checks and broadcasts every change."""
+
+    is_host = True
+
+    def __init__(self, store, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.token = token
+        self.requests = queue.Queue() # (client, request) from the loop thread, for process()
+        self._sequence = itertools.count(1)
+        self._versions = {team.rank: next(self._sequence) for team in store} # Tk thread
+        self._rows = {} # rank -> wire row, mirrored on the loop thread for joining operators
+        self._clients = set()
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_error = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def version(self, rank):
+        """Current version of row #rank (0 if there is no such team)."""
+        return self._versions.get(rank, 0)
+
+    def _wire_row(self, team):
+        return [team.rank, team.name, team.points, team.status, self._versions[team.rank]]
+
+    # --- Tk Thread ---
+    def start(self):
+        """Starts accepting operators. Raises OSError if the port is taken.
+
+        Raises StandingsError if the host listens beyond this machine without a token.
+        """
+        if not self.token and not is_loopback(self.host):
+            raise StandingsError(f"Operators on other machines could edit the table unchecked: "
+                                 f"give a shared token (--token) to listen on {self.host}.")
+        rows = {team.rank: self._wire_row(team) for team in self.store}
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main(rows)), name="sharing-host", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error:
+            raise self._start_error
+        self.store.add_listener(self.on_change)
+
+    def stop(self, timeout=5):
+        if self._loop and self._stopping:
+            self.store.remove_listener(self.on_change)
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join(timeout)
+
+    def on_change(self, change):
+        """Standings listener: bumps the versions of changed rows and sends them to every operator."""
+        if change.op == "clear":
+            self._versions.clear()
+            self._send_all({"type": "rows", "reset": True, "upsert": [], "delete": []})
+            return
+        upserts, deletes = [], []
+        for inner in change.after if change.op == "batch" else (change,):
+            if inner.after is None:
+                self._versions.pop(inner.rank, None)
+                deletes.append(inner.rank)
+            else:
+                self._versions[inner.rank] = next(self._sequence)
+                upserts.append(self._wire_row(inner.after))
+        self._send_all({"type": "rows", "upsert": upserts, "delete": deletes})
+
+    def submit(self, request):
+        """Applies an edit made in the host's own editor. Returns the reply at once."""
+        return self._apply(request)
+
+    def process(self):
+        """Applies queued operator edits to the store and answers them.
+
+        Returns [] like SharingClient.process(): the host's own edits are
+        answered by submit() directly.
+        """
+        while True:
+            try:
+                client, request = self.requests.get_nowait()
+            except queue.Empty:
+                return []
+            self._send(client, self._apply(request))
+
+    def _apply(self, request):
+        """Applies one edit if its row is still at the version it was based on."""
+        request_id = request.get("id")
+        try:
+            if request.get("op") not in OPERATIONS:
+                raise StandingsError(f"Unknown operation {request.get('op')!r}.")
+            rank = request["rank"]
+            expected = request.get("version", 0)
+            if not (_is_int(rank) and _is_int(expected)):
+                raise StandingsError("# and version must be numbers.")
+            fields = _edit_fields(request)
+            current = self.store.get(rank)
+            if request.get("op") in ("toggle", "eliminate"):
+                if current is None:
+                    return {"type": "conflict", "id": request_id, "rank": rank, "row": None,
+                            "message": f"# {rank} was deleted by another operator."}
+                indicator = request.get("indicator")
+                if request["op"] == "toggle" and not _is_int(indicator):
+                    raise StandingsError("Player must be a number.")
+                status = 0 if request["op"] == "eliminate" else toggle_indicator(current.status, indicator)
+                self.store.update(rank, status=status)
+                return {"type": "ack", "id": request_id, "rank": rank, "version": self.version(rank)}
+            if expected != self.version(rank):
+                if current is None:
+                    message, row = f"# {rank} was deleted by another operator.", None
+                else:
+                    verb = "added" if expected == 0 else "changed"
+                    message, row = f"# {rank} was {verb} by another operator.", self._wire_row(current)
+                return {"type": "conflict", "id": request_id, "rank": rank, "row": row, "message": message}
+            if request.get("op") == "delete":
+                self.store.delete(rank)
+            elif current is None:
+                self.store.add(rank, fields.get("name", ""), fields.get("points", 0), fields.get("status", 0))
+            else:
+                self.store.update(rank, **fields)
+        except (StandingsError, KeyError, TypeError) as e:
+            return {"type": "error", "id": request_id, "message": str(e)}
+        return {"type": "ack", "id": request_id, "rank": rank, "version": self.version(rank)}
+
+    def _send_all(self, message):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._broadcast, message)
+
+    def _send(self, client, message):
+        if self._loop:
+            self._loop.call_soon_threadsafe(client.put_nowait, _dumps(message))
+
+    # --- Loop Thread ---
+    def _broadcast(self, message):
+        if message.get("reset"):
+            self._rows.clear()
+        for rank in message["delete"]:
+            self._rows.pop(rank, None)
+        for row in message["upsert"]:
+            self._rows[row[0]] = row
+        data = _dumps(message)
+        for client in self._clients:
+            client.put_nowait(data)
+
+    async def _main(self, rows):
+        self._rows = rows
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            self._start_error = e
+            self._ready.set()
+            return
+        if self.port == 0: # Ephemeral port requested; report the real one
+            self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await self._stopping.wait()
+            for client in self._clients:
+                client.put_nowait(None)
+
+    def _authorized(self, hello):
+        """True if an operator's first line is a hello with the host's token (if it has one)."""
+        if not (isinstance(hello, dict) and hello.get("op") == "hello"):
+            return False
+        token = hello.get("token")
+        if not self.token:
+            return True
+        return isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+    async def _handle(self, reader, writer):
+        try:
+            hello = json.loads(await asyncio.wait_for(reader.readline(), HELLO_TIMEOUT))
+        except (ValueError, ConnectionError, asyncio.TimeoutError):
+            hello = None
+        if not self._authorized(hello):
+            writer.write(_dumps({"type": "error", "id": None, "message": "Wrong or missing sharing token."}))
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+        client = asyncio.Queue()
+        client.put_nowait(_dumps({"type": "state", "rows": [self._rows[rank] for rank in sorted(self._rows)]}))
+        self._clients.add(client)
+        sender = asyncio.ensure_future(self._send_loop(client, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(request, dict):
+                    self.requests.put((client, request))
+        except (ConnectionError, asyncio.CancelledError):
+            pass # Operator went away, or the host is shutting down
+        finally:
+            self._clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def _send_loop(self, client, writer):
+        try:
+            while True:
+                data = await client.get()
+                if data is None:
+                    return
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+
+class SharingClient:
+    """A joined operator's replica of the host's store, plus a channel for sending edits."""
+
+    is_host = False
+
+    def __init__(self, store, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+        self.store = store # Replica; only changed by process()
+        self.host = host
+        self.port = port
+        self.token = token
+        self.incoming = queue.Queue()
+        self.connected = False
+        self._versions = {}
+        self._ids = itertools.count(1)
+        self._socket = None
+        self._send_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def version(self, rank):
+        return self._versions.get(rank, 0)
+
+    def start(self):
+        """Connects and loads the host's table. Raises OSError if the host cannot be reached."""
+        self._socket = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        self._socket.sendall(_dumps({"op": "hello", "token": self.token}))
+        file = self._socket.makefile("rb")
+        first = file.readline()
+        if not first:
+            raise ConnectionError(f"{self.address} closed the connection.")
+        state = json.loads(first)
+        if state.get("type") == "error":
+            raise ConnectionError(f"{self.address} refused to let us join: {state['message']}")
+        self._socket.settimeout(None)
+        self.connected = True
+        self.incoming.put(state)
+        self.process()
+        self._thread = threading.Thread(target=self._read, args=(file,), name="sharing-client", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.connected = False
+        if self._socket:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+
+    def submit(self, request):
+        """Sends an edit to the host. Returns None; the ack or conflict comes back from process()."""
+        request = dict(request, id=next(self._ids))
+        if not self.connected:
+            return {"type": "error", "id": request["id"], "message": f"Not connected to {self.address}."}
+        try:
+            with self._send_lock:
+                self._socket.sendall(_dumps(request))
+        except OSError as e:
+            return {"type": "error", "id": request["id"], "message": f"Could not reach {self.address}: {e}"}
+        return None
+
+    def _read(self, file):
+        try:
+            for line in file:
+                try:
+                    self.incoming.put(json.loads(line))
+                except ValueError:
+                    continue
+        except OSError:
+            pass
+        if self.connected:
+            self.connected = False
+            self.incoming.put({"type": "error", "id": None, "message": f"Lost connection to {self.address}."})
+
+    def process(self):
+        """Applies the host's updates to the replica. Returns replies to this operator's edits."""
+        replies = []
+        while True:
+            try:
+                message = self.incoming.get_nowait()
+            except queue.Empty:
+                return replies
+            kind = message.get("type")
+            if kind in ("state", "rows"):
+                self._apply_rows(message)
+            else:
+                replies.append(message)
+
+    def _apply_rows(self, message):
+        reset = message["type"] == "state" or message.get("reset")
+        rows = message["rows"] if message["type"] == "state" else message["upsert"]
+        deletes = [] if reset else [rank for rank in message["delete"] if rank in self.store]
+        if reset:
+            self._versions.clear()
+        for rank in deletes:
+            self._versions.pop(rank, None)
+        for rank, _name, _points, _status, version in rows:
+            self._versions[rank] = version
+        self.store.apply_batch([tuple(row[:4]) for row in rows], deletes=deletes, replace=bool(reset))
@@ -0,0 +1,349 @@
+"""GUI-free standings model for the BGMI table editor.
+
+The Tk editor (bgmi.py) is a thin client of this module, so everything here
+can also be driven from scripts and benchmarks without a display.
+"""
+
+from collections import namedtuple
+
+NUM_STATUS_INDICATORS = 4
+ALIVE = "✅"
+DEAD = "❌"
+ALL_ALIVE = (1 << NUM_STATUS_INDICATORS) - 1
+COLUMNS = ("#", "Team", "Points", "Status")
+
+# Status text for every possible bitmask, so rendering a row never builds strings.
+STATUS_TEXT = tuple(
+    "".join(ALIVE if mask & (1 << i) else DEAD for i in range(NUM_STATUS_INDICATORS))
+    for mask in range(1 << NUM_STATUS_INDICATORS)
+)
+
+
+class StandingsError(ValueError):
+    """Raised when an edit would leave the standings inconsistent."""
+
+
+# --- Status Helpers ---
+def status_to_mask(status):
+    """Converts a status string (✅/❌ or 🟩/🟥) to a bitmask, bit i = indicator i alive.
+
+    Missing indicators count as eliminated and extra characters are ignored,
+    matching how the editor has always padded/truncated odd status cells.
+    """
+    mask = 0
+    for i, char in enumerate(status[:NUM_STATUS_INDICATORS]):
+        if char in (ALIVE, "🟩"):
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_status(mask):
+    """Converts a status bitmask back to its ✅/❌ display string."""
+    return STATUS_TEXT[mask & ALL_ALIVE]
+
+
+def toggle_indicator(mask, index):
+    """Returns the mask with indicator `index` flipped."""
+    if not 0 <= index < NUM_STATUS_INDICATORS:
+        raise StandingsError(f"Status indicator {index + 1} does not exist.")
+    return mask ^ (1 << index)
+
+
+# --- Team Record ---
+# Immutable copy of a Team, safe to hand to other threads.
+TeamRow = namedtuple("TeamRow", ("rank", "name", "points", "status"))
+
+# One edit, as passed to Standings listeners. op is "add", "update", "delete"
+# or "clear"; before/after are TeamRows (None where the team did not exist).
+# For "clear", rank is None and before is the tuple of every removed TeamRow.
+# For "batch" (see Standings.apply_batch), rank and before are None and after
+# is the tuple of add/update/delete Changes the transaction made.
+Change = namedtuple("Change", ("op", "rank", "before", "after"))
+
+
+class Team:
+    """One row of the standings table. Status is stored as a bitmask."""
+
+    __slots__ = ("rank", "name", "points", "status")
+
+    def __init__(self, rank, name, points, status=0):
+        self.rank = rank
+        self.name = name
+        self.points = points
+        self.status = status
+
+    @property
+    def status_text(self):
+        return STATUS_TEXT[self.status]
+
+    def freeze(self):
+        """Returns an immutable TeamRow copy of this team."""
+        return TeamRow(self.rank, self.name, self.points, self.status)
+
+    def as_row(self):
+        """Returns the row in the editor's [#, Team, Points, Status] layout."""
+        return [self.rank, self.name, self.points, STATUS_TEXT[self.status]]
+
+    def __eq__(self, other):
+        if not isinstance(other, Team):
+            return NotImplemented
+        return (self.rank, self.name, self.points, self.status) == (other.rank, other.name, other.points, other.status)
+
+    def __repr__(self):
+        return f"Team({self.rank!r}, {self.name!r}, {self.points!r}, {self.status_text!r})"
+
+
+# --- Standings Store ---
+def _name_key(name):
+    return name.strip().casefold()
+
+
+def sort_key(col):
+    """Maps a display column to the key function used for sorting Teams."""
+    if col == "#":
+        return lambda team: team.rank
+    if col == "Team":
+        return lambda team: team.name.lower()
+    if col == "Points":
+        return lambda team: team.points
+    if col == "Status":
+        return lambda team: STATUS_TEXT[team.status]
+    raise StandingsError(f"Unknown column: {col}")
+
+
+class Standings:
+    """Teams indexed by # and by (case-insensitive) team name.
+
+    Every lookup, add, update and delete is O(1); only producing an ordered
+    view of the table costs a sort. `generation` goes up on every edit that
+    actually changes a team, so callers can tell cheaply whether anything
+    needs saving. Listeners get a Change for each such edit.
+    """
+
+    def __init__(self, teams=()):
+        self._by_rank = {}
+        self._by_name = {}
+        self._listeners = []
+        self.on_listener_error = None # on_listener_error(name, exception); default prints a warning
+        self.generation = 0
+        for team in teams:
+            self.add(team.rank, team.name, team.points, team.status)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds a store from [#, Team, Points, Status] rows, status given as text."""
+        store = cls()
+        for rank, name, points, status in rows:
+            store.add(rank, name, points, status_to_mask(status) if isinstance(status, str) else status)
+        return store
+
+    def add_listener(self, callback):
+        """Calls callback(change) after every edit that changes the store."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self._listeners.remove(callback)
+
+    def _changed(self, op, rank, before, after):
+        self.generation += 1
+        if self._listeners:
+            change = Change(op, rank, before, after)
+            for callback in tuple(self._listeners):
+                # The store has already changed: one failing listener (e.g. the journal
+                # on a full disk) must not keep the others from seeing it
+                try:
+                    callback(change)
+                except Exception as e:
+                    self._listener_failed(callback, e)
+
+    def _listener_failed(self, callback, error):
+        name = getattr(callback, "__qualname__", repr(callback))
+        if self.on_listener_error:
+            self.on_listener_error(name, error)
+        else:
+            print(f"Warning: {name} failed on a standings change: {error}")
+
+    def __len__(self):
+        return len(self._by_rank)
+
+    def __iter__(self):
+        return iter(self._by_rank.values())
+
+    def __contains__(self, rank):
+        return rank in self._by_rank
+
+    def get(self, rank):
+        """Returns the Team with this #, or None."""
+        return self._by_rank.get(rank)
+
+    def find(self, name):
+        """Returns the Team with this name (case-insensitive), or None."""
+        return self._by_name.get(_name_key(name))
+
+    def add(self, rank, name, points, status=0):
+        """Adds a team and returns it. Raises StandingsError on a duplicate # or team name."""
+        name = name.strip()
+        if not name:
+            raise StandingsError("Team name cannot be empty!")
+        if rank in self._by_rank:
+            raise StandingsError(f"# {rank} already exists!")
+        key = _name_key(name)
+        if key in self._by_name:
+            raise StandingsError(f"Team '{name}' already exists!")
+        team = Team(rank, name, points, status & ALL_ALIVE)
+        self._by_rank[rank] = team
+        self._by_name[key] = team
+        self._changed("add", rank, None, team.freeze())
+        return team
+
+    def update(self, rank, name=None, points=None, status=None):
+        """Changes the given fields of team #rank in place and returns the Team.
+
+        Re-applying values the team already has is a no-op and leaves
+        `generation` untouched.
+        """
+        team = self._by_rank.get(rank)
+        if team is None:
+            raise StandingsError(f"# {rank} does not exist!")
+        before = team.freeze()
+        if name is not None:
+            name = name.strip()
+            if not name:
+                raise StandingsError("Team name cannot be empty!")
+            old_key, new_key = _name_key(team.name), _name_key(name)
+            if new_key != old_key:
+                if new_key in self._by_name:
+                    raise StandingsError(f"Team '{name}' already exists!")
+                del self._by_name[old_key]
+                self._by_name[new_key] = team
+            team.name = name
+        if points is not None:
+            team.points = points
+        if status is not None:
+            team.status = status & ALL_ALIVE
+        after = team.freeze()
+        if after != before:
+            self._changed("update", rank, before, after)
+        return team
+
+    def delete(self, rank):
+        """Removes team #rank and returns it."""
+        team = self._by_rank.pop(rank, None)
+        if team is None:
+            raise StandingsError(f"# {rank} does not exist!")
+        del self._by_name[_name_key(team.name)]
+        self._changed("delete", rank, team.freeze(), None)
+        return team
+
+    def clear(self):
+        """Removes every team."""
+        if self._by_rank:
+            removed = self.snapshot() if self._listeners else ()
+            self._by_rank.clear()
+            self._by_name.clear()
+            self._changed("clear", None, removed, None)
+
+    def apply_batch(self, rows, deletes=(), replace=False):
+        """Applies many edits as one transaction and returns the number of teams changed.
+
+        rows are (rank, name, points, status) tuples: a new # adds a team, an
+        existing # updates it. name, points and status may be None to keep
+        the team's current value (points/status default to 0 for new teams).
+        deletes are #s to remove; with replace=True every team not in rows is
+        removed. The whole batch is validated against the indexes first, so
+        it either applies completely or raises StandingsError and changes
+        nothing. Listeners get a single "batch" Change.
+        """
+        errors = []
+        staged = []
+        batch_ranks = set()
+        for index, (rank, name, points, status) in enumerate(rows, start=1):
+            if not isinstance(rank, int) or (points is not None and not isinstance(points, int)):
+                errors.append(f"Row {index}: # and Points must be numbers.")
+                continue
+            if rank in batch_ranks:
+                errors.append(f"Row {index}: # {rank} appears more than once.")
+                continue
+            batch_ranks.add(rank)
+            current = self._by_rank.get(rank)
+            if name is None:
+                if current is None:
+                    errors.append(f"Row {index}: new team # {rank} needs a name.")
+                    continue
+                name = current.name
+            name = name.strip()
+            if not name:
+                errors.append(f"Row {index}: Team name cannot be empty!")
+                continue
+            if points is None:
+                points = current.points if current else 0
+            if status is None:
+                status = current.status if current else 0
+            staged.append((rank, name, points, status & ALL_ALIVE, current))
+
+        if replace:
+            deleted = [rank for rank in self._by_rank if rank not in batch_ranks]
+        else:
+            deleted = []
+            for rank in deletes:
+                if rank in batch_ranks:
+                    errors.append(f"# {rank} cannot be both changed and deleted.")
+                elif rank not in self._by_rank:
+                    errors.append(f"# {rank} does not exist!")
+                else:
+                    deleted.append(rank)
+
+        # Names must be unique among the teams that remain afterwards
+        leaving = batch_ranks.union(deleted)
+        batch_names = {}
+        for rank, name, _points, _status, _current in staged:
+            key = _name_key(name)
+            if key in batch_names:
+                errors.append(f"Team '{name}' appears more than once.")
+            batch_names[key] = rank
+            holder = self._by_name.get(key)
+            if holder is not None and holder.rank not in leaving:
+                errors.append(f"Team '{name}' already exists as # {holder.rank}!")
+        if errors:
+            shown = "\n".join(errors[:10])
+            more = f"\n...and {len(errors) - 10} more problems." if len(errors) > 10 else ""
+            raise StandingsError(f"Batch rejected, nothing was changed:\n{shown}{more}")
+
+        # Validated: apply without further checks. Names are re-indexed from
+        # scratch for touched teams so renames within the batch cannot collide.
+        changes = []
+        for rank in deleted:
+            team = self._by_rank.pop(rank)
+            del self._by_name[_name_key(team.name)]
+            changes.append(Change("delete", rank, team.freeze(), None))
+        for _rank, _name, _points, _status, current in staged:
+            if current is not None:
+                del self._by_name[_name_key(current.name)]
+        for rank, name, points, status, current in staged:
+            if current is None:
+                team = self._by_rank[rank] = Team(rank, name, points, status)
+                changes.append(Change("add", rank, None, team.freeze()))
+            else:
+                team = current
+                before = team.freeze()
+                team.name, team.points, team.status = name, points, status
+                after = team.freeze()
+                if after != before:
+                    changes.append(Change("update", rank, before, after))
+            self._by_name[_name_key(name)] = team
+
+        if changes:
+            self._changed("batch", None, None, tuple(changes))
+        return len(changes)
+
+    def ordered(self, col="#", reverse=False):
+        """Returns the Teams sorted by a display column ("#", "Team", "Points" or "Status")."""
+        return sorted(self._by_rank.values(), key=sort_key(col), reverse=reverse)
+
+    def rows(self):
+        """Returns [#, Team, Points, Status] rows sorted by #, as written to the overlay."""
+        return [team.as_row() for team in self.ordered("#")]
+
+    def snapshot(self):
+        """Returns an immutable tuple of TeamRows sorted by #, for background rendering."""
+        return tuple(team.freeze() for team in self.ordered("#"))
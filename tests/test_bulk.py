@@ -0,0 +1,60 @@
+import pytest
+
+from bulk import parse_import, parse_match_results, read_import_file
+from standings import StandingsError
+
+
+def test_csv_without_a_header():
+    assert parse_import("1,GodLike,10,✅✅❌✅\n2,Soul,,\n") == [(1, "GodLike", 10, 0b1011), (2, "Soul", None, None)]
+
+
+def test_csv_header_picks_the_columns():
+    text = "Team,Status,#\nGodLike,1101,1\n"
+    assert parse_import(text) == [(1, "GodLike", None, 0b1011)]
+    with pytest.raises(StandingsError, match="no '#' column"):
+        parse_import("Team,Points\nGodLike,10\n")
+
+
+def test_tab_separated_text_from_a_spreadsheet():
+    assert parse_import("#\tTeam\tPoints\n3\tOR\t7\n") == [(3, "OR", 7, None)]
+
+
+@pytest.mark.parametrize("text", [
+    '[[1, "GodLike", 10, "🟩🟩🟥🟩"]]',
+    '[{"rank": 1, "name": "GodLike", "pts": 10, "status": 11}]',
+    '{"teams": [{"#": 1, "team": "GodLike", "points": "10", "status": "1101"}]}',
+])
+def test_json_lists_objects_and_status_formats(text):
+    assert parse_import(text) == [(1, "GodLike", 10, 0b1011)]
+
+
+@pytest.mark.parametrize("text", [
+    '[[true, "GodLike", 10]]',
+    '[[1, "GodLike", false]]',
+    '[[1, "GodLike", 10, true]]',
+    '[[1, "GodLike", 10, 16]]',
+    '[[1, "GodLike", 10, -1]]',
+    '[{"team": "GodLike"}]',
+    '[1, 2]',
+    "1,GodLike,ten\n",
+])
+def test_bad_values_are_rejected(text):
+    with pytest.raises(StandingsError):
+        parse_import(text)
+
+
+def test_read_import_file_reports_unreadable_files(tmp_path):
+    path = tmp_path / "teams.csv"
+    path.write_bytes(b"\xef\xbb\xbf1,GodLike,10\n") # With a BOM, as Excel saves it
+    assert read_import_file(str(path)) == [(1, "GodLike", 10, None)]
+    path.write_bytes(b"1,\xff\xfe,10\n")
+    with pytest.raises(StandingsError, match="Cannot read"):
+        read_import_file(str(path))
+    with pytest.raises(StandingsError, match="Cannot read"):
+        read_import_file(str(tmp_path / "missing.csv"))
+
+
+def test_match_results():
+    assert parse_match_results("Team,Placement,Kills\nGodLike,1,7\nSoul,2\n") == [("GodLike", 1, 7), ("Soul", 2, 0)]
+    with pytest.raises(StandingsError, match="Line 2"):
+        parse_match_results("GodLike,1,7\nSoul\n")
@@ -0,0 +1,19 @@
+from journal import Journal
+from standings import Standings
+
+
+def test_recover_ignores_a_truncated_last_record(tmp_path):
+    journal = Journal(str(tmp_path / "BGMI.journal"), str(tmp_path / "BGMI.snapshot.json"), fsync=False)
+    store = Standings()
+    journal.attach(store)
+    store.add(1, "Alpha", 10)
+    store.add(2, "Bravo", 8)
+    store.update(1, points=12)
+    journal.close()
+    with open(journal.path, "ab") as file:
+        file.write(b'["u",2,"Bravo",2') # Cut off mid-write
+
+    recovered = Journal(journal.path, journal.snapshot_path, fsync=False)
+    store = recovered.recover()
+    assert [(team.rank, team.name, team.points) for team in store] == [(1, "Alpha", 12), (2, "Bravo", 8)]
+    assert recovered.warnings == [f"{journal.path}: ignored incomplete last record (interrupted write)."]
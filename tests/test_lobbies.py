@@ -0,0 +1,29 @@
+import pytest
+
+from lobbies import LobbySet
+from render import OverlayRenderer
+from standings import Standings, StandingsError
+
+
+@pytest.fixture
+def lobby_set(tmp_path):
+    lobbies = LobbySet([("A", str(tmp_path / "A.html")), ("B", str(tmp_path / "B.html"))], str(tmp_path / "overall.html"))
+    for lobby in lobbies:
+        lobby.store, lobby.renderer = Standings(), OverlayRenderer()
+    yield lobbies
+    lobbies.close()
+
+
+def test_save_queues_only_the_named_lobbies(lobby_set):
+    lobby_set["A"].store.add(1, "Alpha", 10)
+    lobby_set["B"].store.add(1, "Bravo", 8)
+    assert lobby_set.save(["A"]) == ["A", "Overall"]
+    assert lobby_set.save() == ["B"] # The overall table already has B's edit
+    assert lobby_set.save() == []
+    assert lobby_set.flush(5)
+    assert [row.name for row in lobby_set.overall_rows()] == ["Alpha", "Bravo"]
+
+
+def test_lobbies_need_files_of_their_own(tmp_path):
+    with pytest.raises(StandingsError):
+        LobbySet([("A", str(tmp_path / "A.html")), ("B", str(tmp_path / "A.htm"))])
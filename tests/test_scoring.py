@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from scoring import ScoringEngine
+from standings import Standings, StandingsError
+
+
+def table(engine):
+    return [(rank, name, points) for rank, name, points, *_tiebreaks in engine.ranking()]
+
+
+def test_points_are_placement_points_plus_kills():
+    engine = ScoringEngine()
+    engine.set_match(0, [("Alpha", 1, 3), ("Bravo", 2, 5), ("Charlie", 9, 1)])
+    engine.set_match(1, [("Alpha", 3, 0), ("Charlie", 1, 2)])
+    assert table(engine) == [(1, "Alpha", 18), (2, "Charlie", 13), (3, "Bravo", 11)]
+
+
+def test_ties_go_to_wins_then_placement_points_then_the_latest_match():
+    engine = ScoringEngine(teams=["Delta", "Echo", "Charlie", "Bravo", "Alpha"])
+    engine.set_match(0, [("Alpha", 1, 0), ("Bravo", 2, 4), ("Charlie", 3, 5), ("Delta", 4, 3), ("Echo", 5, 3)])
+    engine.set_match(1, [("Delta", 5, 0), ("Echo", 4, 0)])
+    # All on 10 points. Alpha has a win; Echo and Delta have 7 placement points, Bravo 6 and
+    # Charlie 5; Echo placed better than Delta in the latest match
+    assert [row[2] for row in engine.ranking()] == [10] * 5
+    assert [row[1] for row in engine.ranking()] == ["Alpha", "Echo", "Delta", "Bravo", "Charlie"]
+
+
+def test_replacing_a_match_only_counts_its_new_results():
+    engine = ScoringEngine()
+    engine.set_match(0, [("Alpha", 1, 3), ("Bravo", 2, 5)])
+    engine.set_match(0, [("Bravo", 1, 0)])
+    assert table(engine) == [(1, "Bravo", 10), (2, "Alpha", 0)]
+    totals = engine.points().tolist()
+    engine.recompute()
+    assert engine.points().tolist() == totals
+
+
+def test_with_match_scores_a_copy_using_the_tables_names():
+    store = Standings.from_rows([(1, "Alpha", 0, 15), (2, "Bravo", 0, 3), (3, "Charlie", 0, 0)])
+    engine = ScoringEngine()
+    updated, rows = engine.with_match(0, [("bravo", 1, 2), ("ALPHA", 2, 0)], store)
+    assert rows == [(1, "Bravo", 12, 3), (2, "Alpha", 6, 15), (3, "Charlie", 0, 0)]
+    assert updated.teams[:2] == ["Bravo", "Alpha"]
+    assert engine.num_matches == 0 and engine.teams == [] # Unchanged
+    with pytest.raises(StandingsError, match="Not in the table: Zulu"):
+        engine.with_match(0, [("Zulu", 1, 0)], store)
+
+
+def test_standings_rows_leave_out_teams_no_longer_in_the_table():
+    engine = ScoringEngine()
+    engine.set_match(0, [("Alpha", 1, 0), ("Bravo", 2, 0), ("Gone", 3, 0)])
+    store = Standings.from_rows([(1, "Bravo", 0, 0), (2, "Alpha", 0, 0), (3, "New", 0, 0)])
+    assert engine.standings_rows(store) == [(1, "Alpha", 10, 0), (2, "Bravo", 6, 0), (3, "New", 0, 0)]
+    assert engine.missing_teams(store) == ["Gone"]
+
+
+@pytest.mark.parametrize("teams", [0, 3])
+def test_to_dict_round_trip(teams):
+    engine = ScoringEngine(placement_points=(12, 8, 4), kill_points=2, teams=[f"Team {i}" for i in range(teams)])
+    engine.set_match(0, [(f"Team {i}", i + 1, i) for i in range(teams)])
+    engine.set_match(1, [])
+    loaded = ScoringEngine.from_dict(engine.to_dict())
+    assert loaded.to_dict() == engine.to_dict()
+    assert loaded.num_matches == 2
+    assert loaded.ranking() == engine.ranking()
+
+
+@pytest.mark.parametrize("data", [[], {"teams": [1]}, {"teams": ["A"], "placements": [[-1]], "kills": [[0]]},
+                                  {"teams": ["A"], "placements": [["x"]], "kills": [[0]]}])
+def test_from_dict_rejects_malformed_results(data):
+    with pytest.raises(ValueError):
+        ScoringEngine.from_dict(data)
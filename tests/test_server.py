@@ -0,0 +1,75 @@
+import json
+import urllib.request
+
+import pytest
+
+from render import OverlayRenderer
+from server import CLIENT_SCRIPT, PushServer, row_payload
+from standings import Standings
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def served():
+    store = Standings.from_rows([(1, "Alpha", 10, 0), (2, "Bravo", 8, 0)])
+    server = PushServer(OverlayRenderer(), port=0)
+    server.start(store.snapshot())
+    store.add_listener(server.publish)
+    yield store, server
+    server.stop()
+
+
+def next_event(stream):
+    """(event name, data) of the next SSE event on stream, skipping keepalive comments."""
+    name, data = None, None
+    while True:
+        line = stream.readline().decode("utf-8").rstrip("\r\n")
+        if line.startswith("event: "):
+            name = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+        elif not line and name:
+            return name, data
+
+
+def test_page_has_the_rows_and_the_client_script(served):
+    store, server = served
+    with urllib.request.urlopen(server.url, timeout=TIMEOUT) as response:
+        page = response.read().decode("utf-8")
+    assert "Alpha" in page and "Bravo" in page
+    assert CLIENT_SCRIPT.strip() in page
+
+
+def test_state_lists_the_rows(served):
+    store, server = served
+    with urllib.request.urlopen(server.url + "state", timeout=TIMEOUT) as response:
+        assert json.loads(response.read()) == [row_payload(team) for team in store.snapshot()]
+
+
+def test_events_start_with_the_table_then_send_deltas(served):
+    store, server = served
+    with urllib.request.urlopen(server.url + "events", timeout=TIMEOUT) as stream:
+        assert next_event(stream) == ("rows", {"reset": True, "upsert": [row_payload(team) for team in store.snapshot()], "delete": []})
+        store.update(2, points=9)
+        assert next_event(stream) == ("rows", {"reset": False, "upsert": [row_payload(store.get(2).freeze())], "delete": []})
+        store.delete(1)
+        assert next_event(stream) == ("rows", {"reset": False, "upsert": [], "delete": [1]})
+
+
+def test_changes_made_while_the_table_is_being_sent_reach_the_page():
+    store = Standings.from_rows([(rank, f"Team {rank}", 0, 0) for rank in range(1, 100001)])
+    server = PushServer(OverlayRenderer(), port=0)
+    server.start(store.snapshot())
+    store.add_listener(server.publish)
+    try:
+        with urllib.request.urlopen(server.url + "events", timeout=TIMEOUT) as stream:
+            store.update(2, points=99) # The table (several MB) is still being written to this page
+            name, delta = next_event(stream)
+            rows = {values[0]: values for values in delta["upsert"]}
+            if rows[2][2] != 99:
+                name, delta = next_event(stream)
+                rows.update((values[0], values) for values in delta["upsert"])
+            assert rows[2][2] == 99
+    finally:
+        server.stop()
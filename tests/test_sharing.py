@@ -0,0 +1,144 @@
+import time
+
+import pytest
+
+from sharing import SharingClient, SharingHost
+from standings import Standings, StandingsError
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def host():
+    store = Standings()
+    store.add(1, "Alpha", 10, 15)
+    store.add(2, "Bravo", 5, 15)
+    sharing = SharingHost(store, port=0)
+    sharing.start()
+    yield sharing
+    sharing.stop()
+
+
+def join(host, token=None):
+    client = SharingClient(Standings(), host.host, host.port, token)
+    client.start()
+    return client
+
+
+def pump(host, clients, until):
+    """Runs the host and clients' process() until until(replies) is true. Returns each client's replies."""
+    replies = {client: [] for client in clients}
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        host.process()
+        for client in clients:
+            replies[client] += client.process()
+        if until(replies):
+            return replies
+        time.sleep(0.01)
+    raise AssertionError(f"timed out; replies so far: {replies}")
+
+
+def test_join_loads_the_hosts_table(host):
+    client = join(host)
+    try:
+        assert client.store.rows() == host.store.rows()
+        assert client.version(1) == host.version(1)
+    finally:
+        client.stop()
+
+
+def test_edits_of_different_rows_both_apply(host):
+    first, second = join(host), join(host)
+    try:
+        first.submit({"op": "edit", "rank": 1, "version": first.version(1), "points": 20})
+        second.submit({"op": "edit", "rank": 2, "version": second.version(2), "status": 3})
+        replies = pump(host, [first, second], lambda replies: all(replies.values()))
+        assert [reply["type"] for reply in replies[first] + replies[second]] == ["ack", "ack"]
+        assert host.store.get(1).points == 20
+        assert host.store.get(2).status == 3
+        pump(host, [first, second], lambda replies: first.store.rows() == second.store.rows() == host.store.rows())
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_stale_version_is_a_conflict(host):
+    first, second = join(host), join(host)
+    try:
+        version = first.version(1)
+        first.submit({"op": "edit", "rank": 1, "version": version, "points": 20})
+        pump(host, [first], lambda replies: replies[first])
+        second.submit({"op": "edit", "rank": 1, "version": version, "points": 30})
+        reply, = pump(host, [second], lambda replies: any(r["type"] == "conflict" for r in replies[second]))[second]
+        assert reply["type"] == "conflict"
+        assert reply["row"][:3] == [1, "Alpha", 20]
+        assert host.store.get(1).points == 20
+    finally:
+        first.stop()
+        second.stop()
+
+
+@pytest.mark.parametrize("request_fields", [
+    {"rank": "1"},
+    {"rank": 3, "name": 5},
+    {"rank": 1, "points": "x"},
+    {"rank": 1, "status": 99},
+    {"rank": True},
+    {"rank": 1, "op": "rename"},
+    {"rank": 1, "op": None},
+])
+def test_bad_requests_get_an_error_reply(host, request_fields):
+    rows = host.store.rows()
+    reply = host.submit(dict({"op": "edit", "id": 7, "version": host.version(request_fields["rank"])}, **request_fields))
+    assert reply["type"] == "error"
+    assert reply["id"] == 7
+    assert host.store.rows() == rows
+
+
+def test_host_keeps_serving_after_a_bad_request(host):
+    client = join(host)
+    try:
+        client.submit({"op": "edit", "rank": 1, "version": client.version(1), "name": 5})
+        client.submit({"op": "edit", "rank": 2, "version": client.version(2), "points": 9})
+        replies = pump(host, [client], lambda replies: len(replies[client]) == 2)[client]
+        assert [reply["type"] for reply in replies] == ["error", "ack"]
+        assert host.store.get(2).points == 9
+    finally:
+        client.stop()
+
+
+def test_quick_toggles_do_not_conflict(host):
+    client = join(host)
+    try:
+        for indicator in (0, 1): # Both sent before the first ack arrives
+            client.submit({"op": "toggle", "rank": 1, "indicator": indicator})
+        replies = pump(host, [client], lambda replies: len(replies[client]) == 2)[client]
+        assert [reply["type"] for reply in replies] == ["ack", "ack"]
+        assert host.store.get(1).status == 0b1100
+        client.submit({"op": "eliminate", "rank": 2})
+        pump(host, [client], lambda replies: replies[client])
+        assert host.store.get(2).status == 0
+    finally:
+        client.stop()
+
+
+def test_hosting_beyond_this_machine_needs_a_token():
+    with pytest.raises(StandingsError):
+        SharingHost(Standings(), "0.0.0.0", 0).start()
+
+
+def test_only_operators_with_the_token_can_join():
+    sharing = SharingHost(Standings.from_rows([(1, "Alpha", 10, 15)]), port=0, token="s3cret")
+    sharing.start()
+    try:
+        for token in (None, "guess"):
+            with pytest.raises(ConnectionError):
+                join(sharing, token)
+        client = join(sharing, "s3cret")
+        try:
+            assert client.store.rows() == sharing.store.rows()
+        finally:
+            client.stop()
+    finally:
+        sharing.stop()
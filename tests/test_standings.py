@@ -0,0 +1,32 @@
+from standings import Standings
+
+
+def test_a_failing_listener_does_not_stop_the_others():
+    store = Standings()
+    seen, errors = [], []
+
+    def broken(change):
+        raise OSError("disk full")
+
+    store.add_listener(broken)
+    store.add_listener(seen.append)
+    store.on_listener_error = lambda name, error: errors.append((name, str(error)))
+    store.add(1, "Alpha", 10)
+    assert store.get(1).name == "Alpha"
+    assert [change.op for change in seen] == ["add"]
+    assert errors == [("test_a_failing_listener_does_not_stop_the_others.<locals>.broken", "disk full")]
+
+
+def test_a_listener_may_remove_itself():
+    store = Standings()
+    calls = []
+
+    def once(change):
+        calls.append(change.op)
+        store.remove_listener(once)
+
+    store.add_listener(once)
+    store.add_listener(lambda change: calls.append(change.op))
+    store.add(1, "Alpha", 10)
+    store.add(2, "Bravo", 5)
+    assert calls == ["add", "add", "add"]
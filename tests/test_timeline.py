@@ -0,0 +1,25 @@
+import pytest
+
+from standings import Standings
+from timeline import Timeline
+
+
+def test_frames_replay_the_table_at_each_interval(tmp_path):
+    clock = iter([100.0, 105.0, 112.0])
+    timeline = Timeline(str(tmp_path / "BGMI.timeline"), clock=lambda: next(clock))
+    store = Standings()
+    timeline.attach(store)
+    store.add(1, "Alpha", 10)
+    store.update(1, points=12)
+    store.add(2, "Bravo", 8)
+    timeline.close()
+
+    frames = [(t, [(row.name, row.points) for row in rows]) for t, rows in timeline.frames(5)]
+    assert frames == [(100.0, [("Alpha", 10)]), (105.0, [("Alpha", 12)]), (110.0, [("Alpha", 12)])]
+
+
+@pytest.mark.parametrize("interval", [0, -5, float("nan")])
+def test_frames_reject_an_interval_that_never_advances(tmp_path, interval):
+    timeline = Timeline(str(tmp_path / "BGMI.timeline"))
+    with pytest.raises(ValueError):
+        next(timeline.frames(interval), None)
@@ -0,0 +1,85 @@
+import pytest
+
+from standings import Standings, StandingsError
+from undo import UndoHistory
+
+
+@pytest.fixture
+def history():
+    store = Standings.from_rows([(1, "Alpha", 10, 15), (2, "Bravo", 8, 15)])
+    return UndoHistory(store)
+
+
+def others_edit(history, *args, **fields):
+    """An edit made by another operator: applied to the store but not an undo step."""
+    with history.paused():
+        history.store.update(*args, **fields)
+
+
+def test_undo_and_redo_an_edit(history):
+    history.store.update(1, points=12)
+    assert history.undo().op == "update"
+    assert history.store.get(1).points == 10
+    assert history.redo().op == "update"
+    assert history.store.get(1).points == 12
+    assert history.redo() is None
+
+
+def test_undo_keeps_another_operators_edit_of_a_different_field(history):
+    history.store.update(1, points=12)
+    others_edit(history, 1, status=3)
+    history.undo()
+    assert history.store.get(1).freeze() == (1, "Alpha", 10, 3)
+
+
+def test_undo_refuses_to_overwrite_another_operators_edit_of_the_same_field(history):
+    history.store.update(1, points=12)
+    others_edit(history, 1, points=20)
+    rows = history.store.rows()
+    with pytest.raises(StandingsError, match="# 1 changed again"):
+        history.undo()
+    assert history.store.rows() == rows
+    assert history.can_undo() # The step is kept until it is skipped
+
+
+def test_skip_drops_a_refused_step(history):
+    history.store.update(2, points=9)
+    history.store.update(1, points=12)
+    others_edit(history, 1, points=20)
+    with pytest.raises(StandingsError):
+        history.undo()
+    assert history.skip().rank == 1
+    history.undo()
+    assert [team.points for team in history.store] == [20, 8]
+    assert not history.can_undo()
+
+
+def test_undo_a_clear_and_a_batch(history):
+    rows = history.store.rows()
+    history.store.apply_batch([(1, "Alpha", 30, 15), (3, "Charlie", 5, 15)], deletes=[2])
+    history.store.clear()
+    history.undo()
+    assert [team.name for team in history.store] == ["Alpha", "Charlie"]
+    history.undo()
+    assert history.store.rows() == rows
+    history.redo()
+    assert [(team.name, team.points) for team in history.store] == [("Alpha", 30), ("Charlie", 5)]
+
+
+def test_undo_of_a_delete_refuses_if_the_number_was_taken_again(history):
+    history.store.delete(2)
+    with history.paused():
+        history.store.add(2, "Zulu", 1)
+    with pytest.raises(StandingsError):
+        history.undo()
+    assert history.store.get(2).name == "Zulu"
+
+
+def test_a_new_edit_ends_the_redo_chain(history):
+    history.store.update(1, points=12)
+    history.undo()
+    assert history.can_redo()
+    history.store.update(2, points=9)
+    assert not history.can_redo()
+    assert history.redo() is None
+    assert history.store.get(1).points == 10
@@ -0,0 +1,33 @@
+import os
+
+from loader import write_cache
+from render import OverlayRenderer
+from standings import Standings
+from watch import edits_since_last_write
+
+
+def write_overlay(path, rows):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(OverlayRenderer().render(Standings.from_rows(rows)))
+
+
+def test_edits_made_while_closed_are_merged(tmp_path):
+    path, cache_path = str(tmp_path / "BGMI.html"), str(tmp_path / "BGMI.cache.json")
+    saved = [(1, "Alpha", 10, 0), (2, "Bravo", 8, 0), (3, "Charlie", 5, 0)]
+    write_overlay(path, saved)
+    write_cache(path, cache_path, saved)
+    store = Standings.from_rows(saved)
+    assert edits_since_last_write(path, cache_path, store) is None
+
+    store.update(2, points=9) # Journaled, but not yet saved to the file
+    store.update(3, points=6)
+    write_overlay(path, [(1, "Alpha", 11, 0), (2, "Bravo", 8, 0), (3, "Charlie", 7, 0)])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    edit = edits_since_last_write(path, cache_path, store)
+    rows, deletes, conflicts = edit.merge
+    assert [tuple(row) for row in rows] == [(1, "Alpha", 11, 0)]
+    assert deletes == []
+    assert [(rank, ours.points, theirs.points) for rank, ours, theirs in conflicts] == [(3, 6, 7)]
+    assert edits_since_last_write(path, cache_path, store) is None # The cache now matches the file
@@ -0,0 +1,157 @@
+import os
+import threading
+
+import pytest
+
+import writer as writer_module
+from loader import file_key
+from render import OverlayRenderer
+from standings import Standings
+from writer import OverlayWriter, content_hash
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def overlay(tmp_path):
+    writer = OverlayWriter(str(tmp_path / "BGMI.html"), str(tmp_path / "BGMI.html.bak"))
+    yield writer
+    writer.close(TIMEOUT)
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def results(writer):
+    found = []
+    while not writer.results.empty():
+        found.append(writer.results.get_nowait())
+    return found
+
+
+def test_saved_generations_and_identical_renders_are_skipped(overlay):
+    store, renderer = Standings.from_rows([(1, "Alpha", 10, 15)]), OverlayRenderer()
+    assert overlay.save(renderer, store)
+    assert overlay.flush(TIMEOUT)
+    assert not overlay.save(renderer, store) # Same generation: not even snapshotted
+    store.update(1, points=11)
+    store.update(1, points=10) # New generation, same content
+    assert overlay.save(renderer, store)
+    assert overlay.flush(TIMEOUT)
+    assert [result.skipped for result in results(overlay)] == [False, True]
+    assert overlay.stats()["written"] == 1
+    assert overlay.stats()["skipped_clean"] == 1
+    assert overlay.stats()["skipped_identical"] == 1
+
+
+def test_an_unchanged_file_on_disk_is_not_rewritten(tmp_path):
+    path = str(tmp_path / "BGMI.html")
+    snapshot = Standings.from_rows([(1, "Alpha", 10, 15)]).snapshot()
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(OverlayRenderer().render(snapshot))
+    writer = OverlayWriter(path)
+    writer.submit(OverlayRenderer(), snapshot)
+    writer.close(TIMEOUT)
+    assert writer.stats()["skipped_identical"] == 1
+
+
+def test_invalidate_writes_the_next_save_again(overlay):
+    store, renderer = Standings.from_rows([(1, "Alpha", 10, 15)]), OverlayRenderer()
+    overlay.save(renderer, store)
+    overlay.flush(TIMEOUT)
+    overlay.invalidate()
+    assert overlay.save(renderer, store)
+    overlay.flush(TIMEOUT)
+    assert overlay.stats()["written"] == 2
+
+
+def test_hash_is_known_before_the_new_file_appears(overlay, monkeypatch):
+    seen = []
+    write_atomic = writer_module.write_atomic
+
+    def spy(path, text, fsync=True):
+        seen.append(overlay.written_hash() == content_hash(text.encode("utf-8")))
+        return write_atomic(path, text, fsync)
+
+    monkeypatch.setattr(writer_module, "write_atomic", spy)
+    overlay.submit(OverlayRenderer(), Standings.from_rows([(1, "Alpha", 10, 15)]).snapshot())
+    overlay.flush(TIMEOUT)
+    assert seen == [True]
+    assert overlay.written_hash() == content_hash(read(overlay.path).encode("utf-8"))
+
+
+class BlockingRenderer(OverlayRenderer):
+    """Holds the worker inside render() until released, so later saves pile up."""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.rendered = []
+
+    def render(self, teams):
+        self.rendered.append(teams[0].points)
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+        return super().render(teams)
+
+
+def test_saves_queued_during_a_write_are_coalesced(overlay):
+    renderer = BlockingRenderer()
+    overlay.submit(renderer, Standings.from_rows([(1, "Alpha", 1, 15)]).snapshot())
+    assert renderer.started.wait(TIMEOUT)
+    for points in (2, 3, 4):
+        overlay.submit(renderer, Standings.from_rows([(1, "Alpha", points, 15)]).snapshot())
+    renderer.release.set()
+    assert overlay.flush(TIMEOUT)
+    assert renderer.rendered == [1, 4] # Only the newest pending snapshot is written
+    assert ">4<" in read(overlay.path)
+
+
+def test_writes_replace_the_file_and_keep_a_hard_linked_backup(overlay, tmp_path):
+    renderer = OverlayRenderer()
+    overlay.submit(renderer, Standings.from_rows([(1, "Alpha", 1, 15)]).snapshot())
+    overlay.flush(TIMEOUT)
+    first = os.stat(overlay.path)
+    overlay.submit(renderer, Standings.from_rows([(1, "Alpha", 2, 15)]).snapshot())
+    overlay.flush(TIMEOUT)
+    assert ">2<" in read(overlay.path)
+    assert ">1<" in read(overlay.backup_path)
+    assert os.stat(overlay.backup_path).st_ino == first.st_ino # The old file itself, not a copy
+    assert os.stat(overlay.path).st_ino != first.st_ino # Replaced by rename, never rewritten in place
+    assert sorted(os.listdir(tmp_path)) == ["BGMI.html", "BGMI.html.bak"] # No temp files left behind
+
+
+def test_a_failed_write_leaves_the_old_file(overlay, tmp_path, monkeypatch):
+    renderer = OverlayRenderer()
+    overlay.submit(renderer, Standings.from_rows([(1, "Alpha", 1, 15)]).snapshot())
+    overlay.flush(TIMEOUT)
+    results(overlay)
+
+    replace = os.replace
+
+    def refuse(src, dst):
+        if dst == overlay.path: # OBS holding the overlay open on Windows
+            raise PermissionError("file in use")
+        replace(src, dst)
+
+    monkeypatch.setattr(writer_module.os, "replace", refuse)
+    monkeypatch.setattr(writer_module, "REPLACE_RETRY_DELAY", 0)
+    overlay.submit(renderer, Standings.from_rows([(1, "Alpha", 2, 15)]).snapshot())
+    overlay.flush(TIMEOUT)
+    result, = results(overlay)
+    assert not result.ok and isinstance(result.error, PermissionError)
+    assert ">1<" in read(overlay.path)
+    assert overlay.written_hash() is None # The next save is written, not skipped
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_after_write_gets_the_key_of_the_file_as_written(tmp_path):
+    path = str(tmp_path / "BGMI.html")
+    keys = []
+    writer = OverlayWriter(path, after_write=lambda snapshot, stat: keys.append(file_key(path, stat)))
+    writer.submit(OverlayRenderer(), Standings.from_rows([(1, "Alpha", 1, 15)]).snapshot())
+    writer.close(TIMEOUT)
+    assert keys == [file_key(path)]
@@ -0,0 +1,309 @@
+"""Timestamped history of the standings, for replays and recaps after the event.
+
+Every change of the store is appended to a timeline file (one short JSON
+line per row, never compacted, unlike the journal) and kept in memory as
+columns: parallel arrays of time, #, name id, points and status mask, one
+entry per row event. Every CHECKPOINT_EVERY events (at least one per team,
+so checkpoints cost O(1) per event) the whole table is kept as a
+checkpoint. rows_at(t) bisects to the last checkpoint before t and replays
+only the events after it, so seeking anywhere in a day of edits is fast.
+
+Timeline lines:
+    [time, rank, name, points, mask]  team added or changed (full new values)
+    [time, rank]                      team deleted
+    [time]                            all teams cleared
+
+Usage: python timeline.py [FILE] [--at TIME] [--csv PATH] [--json PATH] [--interval SECONDS]
+       (TIME is ISO 8601, e.g. 2026-10-17T20:15:00, or seconds since the epoch)
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime
+
+from standings import Standings, TeamRow, mask_to_status
+
+TIMELINE_FILE = "BGMI.timeline"
+CHECKPOINT_EVERY = 1000 # Row events between checkpoints
+DELETED = -1 # Status column values of events that are not a row's new values
+CLEARED = -2
+
+# op: "set" (team added or changed), "delete" or "clear". name is None unless op is "set".
+Event = namedtuple("Event", ("time", "op", "rank", "name", "points", "status"))
+CSV_COLUMNS = ("Time", "Seconds", "Event", "#", "Team", "Points", "Status", "Mask")
+
+
+def _dumps(record):
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def format_time(seconds):
+    """Local ISO 8601 time with milliseconds, as written to exports."""
+    return datetime.fromtimestamp(seconds).isoformat(timespec="milliseconds")
+
+
+def parse_time(value):
+    """Parses an ISO 8601 time or a number of seconds since the epoch."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+class Timeline:
+    """Every row change of a store with its time, replayable to any moment."""
+
+    def __init__(self, path=TIMELINE_FILE, checkpoint_every=CHECKPOINT_EVERY, clock=time.time):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.clock = clock
+        self.warnings = [] # Problems found during the last load()
+        self._times = array("d")
+        self._ranks = array("q")
+        self._name_ids = array("l")
+        self._points = array("q")
+        self._status = array("b")
+        self._names = [] # Name table; the name column holds indexes into it
+        self._name_index = {}
+        self._state = {} # rank -> (name id, points, status) after the last event
+        self._checkpoints = [0] # Event index at which each checkpoint state was taken
+        self._checkpoint_states = [{}]
+        self._file = None
+        self._store = None
+
+    def __len__(self):
+        return len(self._times)
+
+    @property
+    def start(self):
+        return self._times[0] if self._times else None
+
+    @property
+    def end(self):
+        return self._times[-1] if self._times else None
+
+    # --- Columns ---
+    def _name_id(self, name):
+        name_id = self._name_index.get(name)
+        if name_id is None:
+            name_id = self._name_index[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def _add(self, t, rank, name, points, status):
+        """Appends one event to the columns and the current state."""
+        if self._times and t < self._times[-1]:
+            t = self._times[-1] # The clock stepped back; keep the columns sorted by time
+        name_id = self._name_id(name) if status >= 0 else -1
+        self._times.append(t)
+        self._ranks.append(rank)
+        self._name_ids.append(name_id)
+        self._points.append(points)
+        self._status.append(status)
+        self._apply(self._state, len(self._times) - 1)
+        if len(self._times) - self._checkpoints[-1] >= max(self.checkpoint_every, len(self._state)):
+            self._checkpoints.append(len(self._times))
+            self._checkpoint_states.append(dict(self._state))
+        return t
+
+    def _apply(self, state, index):
+        status = self._status[index]
+        if status == CLEARED:
+            state.clear()
+        elif status == DELETED:
+            state.pop(self._ranks[index], None)
+        else:
+            state[self._ranks[index]] = (self._name_ids[index], self._points[index], status)
+
+    def _state_at(self, t):
+        """(state dict, index of the first event after t): nearest checkpoint plus the events since."""
+        end = bisect_right(self._times, t)
+        checkpoint = bisect_right(self._checkpoints, end) - 1
+        state = dict(self._checkpoint_states[checkpoint])
+        for index in range(self._checkpoints[checkpoint], end):
+            self._apply(state, index)
+        return state, end
+
+    def _rows(self, state):
+        return tuple(TeamRow(rank, self._names[name_id], points, status)
+                     for rank, (name_id, points, status) in sorted(state.items()))
+
+    # --- Replay ---
+    def rows_at(self, t):
+        """The standings at time t (seconds since the epoch) as TeamRows sorted by #."""
+        return self._rows(self._state_at(t)[0])
+
+    def standings_at(self, t):
+        return Standings.from_rows(self.rows_at(t))
+
+    def events(self, start=None, end=None):
+        """Yields the Events from start to end (inclusive; None = the whole timeline)."""
+        first = 0 if start is None else bisect_left(self._times, start)
+        last = len(self._times) if end is None else bisect_right(self._times, end)
+        ops = {DELETED: "delete", CLEARED: "clear"}
+        for index in range(first, last):
+            status = self._status[index]
+            if status >= 0:
+                yield Event(self._times[index], "set", self._ranks[index], self._names[self._name_ids[index]],
+                            self._points[index], status)
+            else:
+                yield Event(self._times[index], ops[status], self._ranks[index], None, None, None)
+
+    def frames(self, interval, start=None, end=None):
+        """Yields (time, rows) every `interval` seconds from start to end, replaying each event once."""
+        if not interval > 0:
+            raise ValueError(f"interval must be a positive number of seconds, not {interval}")
+        if not self._times:
+            return
+        t = self.start if start is None else start
+        end = self.end if end is None else end
+        state, index = self._state_at(t)
+        while t <= end:
+            upto = bisect_right(self._times, t)
+            for event_index in range(index, upto):
+                self._apply(state, event_index)
+            index = max(index, upto)
+            yield t, self._rows(state)
+            t += interval
+
+    # --- Export ---
+    def export_csv(self, path, start=None, end=None):
+        """Writes the events from start to end as CSV, one row event per line. Returns the count."""
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            out = csv.writer(file)
+            out.writerow(CSV_COLUMNS)
+            for event in self.events(start, end):
+                status = "" if event.status is None else mask_to_status(event.status)
+                out.writerow((format_time(event.time), f"{event.time:.3f}", event.op, event.rank if event.op != "clear" else "",
+                              event.name or "", "" if event.points is None else event.points, status,
+                              "" if event.status is None else event.status))
+                count += 1
+        return count
+
+    def export_json(self, path, interval=None, start=None, end=None):
+        """Writes the events, or with `interval` the whole table every interval seconds, as JSON.
+
+        Returns the number of events or frames written.
+        """
+        if interval:
+            items = [{"time": format_time(t), "seconds": round(t, 3), "rows": [list(row) for row in rows]}
+                     for t, rows in self.frames(interval, start, end)]
+            document = {"interval": interval, "frames": items}
+        else:
+            items = [{"time": format_time(event.time), "seconds": round(event.time, 3), "event": event.op,
+                      "rank": event.rank, "team": event.name, "points": event.points, "status": event.status}
+                     for event in self.events(start, end)]
+            document = {"events": items}
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(document, file, ensure_ascii=False, indent=1)
+        return len(items)
+
+    # --- Recording ---
+    def load(self):
+        """Reads the timeline file into memory. Problems are listed in `warnings`."""
+        self.warnings = []
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            lines = file.read().split(b"\n")
+        if lines and lines[-1] == b"":
+            lines.pop()
+        for line_no, line in enumerate(lines, start=1):
+            try:
+                record = json.loads(line)
+                if len(record) == 5:
+                    self._add(*record)
+                elif len(record) == 2:
+                    self._add(record[0], record[1], None, 0, DELETED)
+                elif len(record) == 1:
+                    self._add(record[0], 0, None, 0, CLEARED)
+                else:
+                    raise ValueError(f"unexpected record {record!r}")
+            except (ValueError, TypeError, OverflowError) as e:
+                self.warnings.append(f"{self.path}: line {line_no} skipped ({e}).")
+
+    def attach(self, store):
+        """Loads the file, records how store differs from where it left off, then records every change."""
+        self.load()
+        self._store = store
+        self._file = open(self.path, "ab")
+        current = {team.rank: team.freeze() for team in store}
+        recorded = self._rows(self._state)
+        lines = [self._log(DELETED, row.rank) for row in recorded if row.rank not in current]
+        lines += [self._log(row.status, *row[:3]) for rank, row in sorted(current.items())
+                  if self._state.get(rank) != (self._name_index.get(row.name), row.points, row.status)]
+        self._write(lines)
+        store.add_listener(self.record)
+
+    def record(self, change):
+        """Standings listener: appends the change's rows with the current time."""
+        if change.op == "clear":
+            lines = [self._log(CLEARED)]
+        else:
+            lines = [self._log(DELETED, inner.rank) if inner.after is None else self._log(inner.after.status, *inner.after[:3])
+                     for inner in (change.after if change.op == "batch" else (change,))]
+        self._write(lines)
+
+    def _log(self, status, rank=0, name=None, points=0):
+        t = self._add(round(self.clock(), 3), rank, name, points, status)
+        if status == CLEARED:
+            return _dumps([t])
+        if status == DELETED:
+            return _dumps([t, rank])
+        return _dumps([t, rank, name, points, status])
+
+    def _write(self, lines):
+        # History, not crash recovery (that is the journal's job): flushed, not fsynced
+        if lines:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+
+    def close(self):
+        if self._store is not None:
+            self._store.remove_listener(self.record)
+            self._store = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay or export a BGMI standings timeline.")
+    parser.add_argument("path", nargs="?", default=TIMELINE_FILE, help=f"timeline file (default {TIMELINE_FILE})")
+    parser.add_argument("--at", type=parse_time, metavar="TIME", help="print the standings at TIME")
+    parser.add_argument("--from", dest="start", type=parse_time, metavar="TIME", help="export from TIME")
+    parser.add_argument("--to", dest="end", type=parse_time, metavar="TIME", help="export up to TIME")
+    parser.add_argument("--csv", metavar="PATH", help="write every row event as CSV")
+    parser.add_argument("--json", metavar="PATH", help="write every row event (or frames, with --interval) as JSON")
+    parser.add_argument("--interval", type=float, metavar="SECONDS", help="with --json, the whole table every SECONDS")
+    args = parser.parse_args()
+    if args.interval is not None and not args.interval > 0:
+        parser.error("--interval must be a positive number of seconds")
+
+    timeline = Timeline(args.path)
+    timeline.load()
+    for warning in timeline.warnings:
+        print(f"Warning: {warning}")
+    if not len(timeline):
+        parser.exit(1, f"{args.path} has no events.\n")
+    print(f"{len(timeline)} events from {format_time(timeline.start)} to {format_time(timeline.end)}.")
+    if args.at is not None:
+        print(f"Standings at {format_time(args.at)}:")
+        for row in timeline.rows_at(args.at):
+            print(f"{row.rank:>5}  {row.name:<25} {row.points:>6}  {mask_to_status(row.status)}")
+    if args.csv:
+        print(f"Wrote {timeline.export_csv(args.csv, args.start, args.end)} events to {args.csv}.")
+    if args.json:
+        what = "frames" if args.interval else "events"
+        print(f"Wrote {timeline.export_json(args.json, args.interval, args.start, args.end)} {what} to {args.json}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Multi-level undo/redo of standings edits.
+
+Every edit the store reports is kept as its Change. Changes hold immutable
+TeamRows that are shared with the journal and push server rather than
+copied, so a status toggle costs a few hundred bytes of history and a whole
+event day of edits fits in a few MB; only a Clear All step holds every
+removed row.
+
+Undoing a step puts back the fields the step changed, from its `before`
+rows, with a single Standings.apply_batch, so it costs O(rows the step
+changed), makes one journal record and one push; redoing writes the
+`after` values the same way. A row that was changed again since (by
+another operator, or an outside edit of the file) is never overwritten:
+the step is refused instead.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+
+from standings import StandingsError
+
+MAX_STEPS = 10000 # Oldest steps are forgotten beyond this
+
+
+def describe(change):
+    """Short description of an undo step for the status line."""
+    if change.op == "batch":
+        return f"change of {len(change.after)} teams"
+    if change.op == "clear":
+        return "Clear All"
+    row = change.after or change.before
+    return f"{change.op} of # {change.rank} ({row.name})"
+
+
+class UndoHistory:
+    """Undo and redo stacks of a store's edits."""
+
+    def __init__(self, store, max_steps=MAX_STEPS):
+        self.store = store
+        self._undo = deque(maxlen=max_steps)
+        self._redo = []
+        self._paused = 0
+        store.add_listener(self.record)
+
+    def record(self, change):
+        """Standings listener: every new edit becomes an undo step and ends the redo chain."""
+        if self._paused:
+            return
+        self._undo.append(change)
+        self._redo.clear()
+
+    @contextmanager
+    def paused(self):
+        """Edits made inside this block are not recorded (undo/redo itself, others' edits)."""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def __len__(self):
+        return len(self._undo)
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Reverts the latest step and returns its Change, or None if there is nothing to undo.
+
+        Raises StandingsError (keeping the step) if the rows cannot be put
+        back, e.g. a row was changed again since by another operator.
+        """
+        if not self._undo:
+            return None
+        change = self._undo[-1]
+        self._apply(change, forward=False)
+        self._redo.append(self._undo.pop())
+        return change
+
+    def redo(self):
+        """Re-applies the latest undone step and returns its Change, or None."""
+        if not self._redo:
+            return None
+        change = self._redo[-1]
+        self._apply(change, forward=True)
+        self._undo.append(self._redo.pop())
+        return change
+
+    def skip(self, redo=False):
+        """Drops the latest undo (or redo) step without applying it, e.g. after a conflict."""
+        steps = self._redo if redo else self._undo
+        return steps.pop() if steps else None
+
+    def _apply(self, change, forward):
+        """Moves each row of the step from its `expected` to its `target` value.
+
+        An edited row only has the fields this step changed put back, and
+        only if they still hold the step's values: a later edit of the same
+        row (another operator's, a merged outside edit) is never overwritten.
+        """
+        rows, deletes, conflicts = [], [], []
+        for inner in change.after if change.op == "batch" else (change,):
+            if inner.op == "clear":
+                pairs = [(row, None) if forward else (None, row) for row in inner.before]
+            else:
+                pairs = [(inner.before, inner.after) if forward else (inner.after, inner.before)]
+            for expected, target in pairs:
+                rank = (expected or target).rank
+                current = self.store.get(rank)
+                current = current.freeze() if current is not None else None
+                if expected is not None and target is not None:
+                    fields = [i for i in range(1, len(target)) if target[i] != expected[i]]
+                    if current is None or any(current[i] != expected[i] for i in fields):
+                        conflicts.append(rank)
+                    else: # None keeps the current value of a field this step did not change
+                        rows.append((rank,) + tuple(target[i] if i in fields else None for i in range(1, len(target))))
+                elif current != expected:
+                    conflicts.append(rank)
+                elif target is None:
+                    deletes.append(rank)
+                else:
+                    rows.append(tuple(target))
+        if conflicts:
+            shown = ", ".join(f"# {rank}" for rank in sorted(conflicts)[:10])
+            more = f" and {len(conflicts) - 10} more" if len(conflicts) > 10 else ""
+            raise StandingsError(f"{shown}{more} changed again since this edit; nothing was changed.")
+        with self.paused():
+            self.store.apply_batch(rows, deletes)
@@ -0,0 +1,164 @@
+"""Display order and team-name search for the virtualized standings view.
+
+The editor's Treeview only ever holds the rows that fit on screen; these
+two helpers answer the questions it needs for that without touching the
+widget:
+
+    OrderedView  "which teams are at positions i..j?" and "at which position
+                 is team #r?" for the current sort column.
+    SearchIndex  "which teams' names start with / contain this text?"
+
+Both are kept up to date as Standings listeners, so a status toggle (the
+common edit during a match) costs nothing here, and neither needs a display.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+
+from standings import sort_key
+
+SEARCH_LIMIT = 50 # Matches returned per search
+GRAM = 3 # Substring searches use an index of 3-character slices of names
+
+
+def _name_key(name):
+    return name.strip().casefold()
+
+
+def _grams(key):
+    return {key[i:i + GRAM] for i in range(len(key) - GRAM + 1)}
+
+
+class OrderedView:
+    """The store's Teams in display order, sorted only when an edit could move a row."""
+
+    def __init__(self, store, col="#", reverse=False):
+        self.store = store
+        self.col = col
+        self.reverse = reverse
+        self._key = sort_key(col)
+        self._order = None # Teams in display order; None = rebuild from the store
+        self._unsorted = False # Same teams as _order, but some sort keys changed
+        self._positions = None # rank -> index in _order, built on first position()
+        store.add_listener(self.on_change)
+
+    def set_sort(self, col, reverse=False):
+        self._key = sort_key(col)
+        self.col, self.reverse = col, reverse
+        self._unsorted = True
+        self._positions = None
+
+    def on_change(self, change):
+        """Standings listener: marks the order stale only if a row may have moved."""
+        changes = change.after if change.op == "batch" else (change,)
+        for inner in changes:
+            if inner.op == "update" and self._key(inner.before) == self._key(inner.after):
+                continue # Patched in place; stays where it is
+            if inner.op == "update" or (inner.op == "add" and self._order is not None):
+                if inner.op == "add":
+                    self._order.append(self.store.get(inner.rank))
+                self._unsorted = True
+            else:
+                self._order = None
+            self._positions = None
+
+    def _ordered(self):
+        if self._order is None:
+            self._order = sorted(self.store, key=self._key, reverse=self.reverse)
+        elif self._unsorted:
+            self._order.sort(key=self._key, reverse=self.reverse) # Nearly sorted: close to linear
+        self._unsorted = False
+        return self._order
+
+    def __len__(self):
+        return len(self.store)
+
+    def window(self, start, count):
+        """Returns the Teams at display positions start..start + count - 1."""
+        return self._ordered()[max(0, start):max(0, start + count)]
+
+    def position(self, rank):
+        """Display position of team #rank, or None if there is no such team."""
+        if self._positions is None:
+            self._positions = {team.rank: index for index, team in enumerate(self._ordered())}
+        return self._positions.get(rank)
+
+
+class SearchIndex:
+    """Case-insensitive prefix and substring search over team names.
+
+    Prefixes are found by bisecting a sorted list of names. Substrings of
+    GRAM or more characters are found by intersecting the sets of teams
+    containing each of their GRAM-character slices; shorter queries only
+    match prefixes.
+    """
+
+    def __init__(self, store=None):
+        self._names = [] # Sorted (name key, rank)
+        self._keys = {} # rank -> name key
+        self._grams = {} # GRAM-character slice -> set of ranks
+        if store is not None:
+            for team in store:
+                key = self._keys[team.rank] = _name_key(team.name)
+                self._names.append((key, team.rank))
+                for gram in _grams(key):
+                    self._grams.setdefault(gram, set()).add(team.rank)
+            self._names.sort() # One sort instead of an insort per team
+            store.add_listener(self.on_change)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _add(self, rank, name):
+        key = _name_key(name)
+        self._keys[rank] = key
+        insort(self._names, (key, rank))
+        for gram in _grams(key):
+            self._grams.setdefault(gram, set()).add(rank)
+
+    def _remove(self, rank):
+        key = self._keys.pop(rank)
+        del self._names[bisect_left(self._names, (key, rank))]
+        for gram in _grams(key):
+            ranks = self._grams[gram]
+            ranks.discard(rank)
+            if not ranks:
+                del self._grams[gram]
+
+    def on_change(self, change):
+        """Standings listener: re-indexes only teams that were added, renamed or deleted."""
+        if change.op == "clear":
+            self._names, self._keys, self._grams = [], {}, {}
+            return
+        for inner in change.after if change.op == "batch" else (change,):
+            if inner.before is not None and (inner.after is None or inner.before.name != inner.after.name):
+                self._remove(inner.rank)
+            if inner.after is not None and (inner.before is None or inner.before.name != inner.after.name):
+                self._add(inner.rank, inner.after.name)
+
+    def prefix(self, query, limit=SEARCH_LIMIT):
+        """#s of teams whose name starts with query, in name order."""
+        query = _name_key(query)
+        matches = []
+        index = bisect_left(self._names, (query,))
+        while index < len(self._names) and len(matches) < limit:
+            key, rank = self._names[index]
+            if not key.startswith(query):
+                break
+            matches.append(rank)
+            index += 1
+        return matches
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """#s of teams whose name starts with query, then of teams whose name contains it."""
+        query = _name_key(query)
+        if not query:
+            return []
+        matches = self.prefix(query, limit)
+        if len(matches) >= limit or len(query) < GRAM:
+            return matches
+        postings = sorted((self._grams.get(gram, ()) for gram in _grams(query)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        contained = ((self._keys[rank], rank) for rank in candidates
+                     if query in self._keys[rank] and not self._keys[rank].startswith(query))
+        return matches + [rank for _key, rank in heapq.nsmallest(limit - len(matches), contained)]
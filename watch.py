@@ -0,0 +1,201 @@
+"""Picks up edits made to an overlay file outside the editor.
+
+FileWatcher notices that the file changed: through inotify on Linux (via
+ctypes, no extra packages), else by polling its mtime and size.
+ExternalEditWatcher then re-parses only the table body and works out a
+row-level, three-way merge against the store:
+
+    base    the rows as the editor last wrote (or loaded) the file
+    ours    the rows in the store now
+    theirs  the rows in the file now
+
+A row only the file changed is taken from the file. A row only the editor
+changed is kept. A row both changed differently is a conflict: the editor
+has an unsaved edit that would otherwise silently overwrite the file's.
+The editor's own saves are recognised by their content hash and ignored.
+
+edits_since_last_write() does the same at startup for edits made while the
+editor was closed, with the parse cache (rewritten after every save) as
+the base.
+"""
+
+import os
+import select
+import struct
+import threading
+from collections import namedtuple
+
+from loader import load_file, parse_bs4, parse_fast, read_cache
+from standings import TeamRow
+from writer import content_hash
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+_EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len
+WAKE_INTERVAL = 0.5 # Seconds between checks for close() on the inotify thread
+
+# rows/deletes: changes from the file that can be applied as they are.
+# conflicts: (rank, ours, theirs) TeamRows (None = no such team on that side).
+Merge = namedtuple("Merge", ("rows", "deletes", "conflicts"))
+ExternalEdit = namedtuple("ExternalEdit", ("html_text", "rows", "merge", "warnings"))
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Reports changes to one file. `mode` is "inotify" or "poll"."""
+
+    def __init__(self, path, use_inotify=True):
+        self.path = path
+        self.mode = "poll"
+        self._key = _stat_key(path)
+        self._event = threading.Event()
+        self._closed = False
+        self._fd = None
+        if use_inotify:
+            try:
+                self._start_inotify()
+                self.mode = "inotify"
+            except (ImportError, OSError, AttributeError):
+                pass # Not Linux, or no inotify: fall back to polling
+
+    def _start_inotify(self):
+        import ctypes # Only needed with --watch, and slow to import
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the directory: the file itself is replaced by rename on every save
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"cannot watch {directory}")
+        self._fd = fd
+        threading.Thread(target=self._read_events, name="file-watcher", daemon=True).start()
+
+    def _read_events(self):
+        name = os.fsencode(os.path.basename(self.path))
+        while not self._closed:
+            if not select.select([self._fd], [], [], WAKE_INTERVAL)[0]:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except OSError:
+                return
+            offset = 0
+            while offset < len(data):
+                _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                if data[offset:offset + length].rstrip(b"\0") == name:
+                    self._event.set()
+                offset += length
+        os.close(self._fd)
+
+    def changed(self):
+        """True (once per change) if the file's mtime or size differs from the last time it was seen."""
+        if self.mode == "inotify":
+            if not self._event.is_set():
+                return False
+            self._event.clear()
+        key = _stat_key(self.path)
+        if key == self._key:
+            return False
+        self._key = key
+        return True
+
+    def close(self):
+        self._closed = True
+
+
+def merge_rows(base, ours, theirs):
+    """Three-way merge of {rank: TeamRow} dicts. Returns a Merge of what to take from theirs."""
+    rows, deletes, conflicts = [], [], []
+    for rank in sorted(base.keys() | theirs.keys()):
+        old, new = base.get(rank), theirs.get(rank)
+        if new == old:
+            continue # Not changed in the file
+        current = ours.get(rank)
+        if current == new:
+            continue # Same change on both sides
+        if current != old:
+            conflicts.append((rank, current, new))
+        elif new is None:
+            deletes.append(rank)
+        else:
+            rows.append(new)
+    return Merge(rows, deletes, conflicts)
+
+
+def edits_since_last_write(path, cache_path, store):
+    """Returns an ExternalEdit if path was changed since the editor last wrote it, else None.
+
+    The cache still matching the file's mtime and size means it holds what
+    the editor wrote. Otherwise the cached rows are the base of the merge
+    (with no cache every differing row is a conflict) and the cache is
+    refreshed from the file. Raises OSError/UnicodeDecodeError if the file
+    cannot be read and loader.LoadError if it has no usable table.
+    """
+    if not os.path.exists(path) or read_cache(path, cache_path) is not None:
+        return None
+    cached = read_cache(path, cache_path, check_file=False)
+    base = {row[0]: TeamRow(*row) for row in cached[0]} if cached else {}
+    result = load_file(path, cache_path)
+    theirs = {team.rank: team.freeze() for team in result.store}
+    ours = {team.rank: team.freeze() for team in store}
+    return ExternalEdit(result.html_text, theirs, merge_rows(base, ours, theirs), result.warnings)
+
+
+class ExternalEditWatcher:
+    """Watches a lobby's overlay file and diffs outside edits against its store.
+
+    base_rows are the rows the file held when it was loaded. set_base() is
+    the writer's after_write hook; accept() records a merged external edit.
+    """
+
+    def __init__(self, path, writer, base_rows=(), use_inotify=True):
+        self.path = path
+        self.writer = writer
+        self.watcher = FileWatcher(path, use_inotify)
+        self._base = {row[0]: TeamRow(*row) for row in base_rows}
+
+    @property
+    def mode(self):
+        return self.watcher.mode
+
+    def set_base(self, snapshot):
+        """Records snapshot as what the file now holds. Safe to call from the writer thread."""
+        self._base = {team.rank: team for team in snapshot}
+
+    def accept(self, rows):
+        self._base = dict(rows)
+
+    def poll(self, store):
+        """Returns an ExternalEdit if the file was changed outside the editor, else None.
+
+        Raises OSError/UnicodeDecodeError if it cannot be read and
+        loader.LoadError if it has no usable table (e.g. half-written).
+        """
+        if not self.watcher.changed():
+            return None
+        with open(self.path, "r", encoding="utf-8") as file:
+            html_text = file.read()
+        if content_hash(html_text.encode("utf-8")) == self.writer.written_hash():
+            return None # Our own save
+        parsed = parse_fast(html_text, self.path) or parse_bs4(html_text, self.path)
+        parsed_rows, warnings = parsed
+        theirs = {row[0]: TeamRow(*row) for row in parsed_rows}
+        ours = {team.rank: team.freeze() for team in store}
+        return ExternalEdit(html_text, theirs, merge_rows(self._base, ours, theirs), warnings)
+
+    def close(self):
+        self.watcher.close()
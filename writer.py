@@ -0,0 +1,291 @@
+"""Background, atomic writer for the OBS overlay file.
+
+Saves are rendered and written on a worker thread so the Tk main loop never
+blocks on disk I/O. Bursts of saves are coalesced: only the newest pending
+snapshot is written. Each write goes to a temp file that is renamed over the
+overlay, so OBS never reads a half-written table.
+
+Saves that cannot change the file are skipped: a store generation that was
+already saved is not even snapshotted, and a render whose bytes hash the
+same as the last written file is not written (which would only bump the
+mtime and make OBS reload).
+
+Several writers (one per lobby overlay) can share a worker pool instead of
+each owning a thread; a writer then occupies at most one pool worker at a
+time, so its saves stay in order while other overlays are written in
+parallel.
+"""
+
+import hashlib
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from metrics import metrics
+
+# Reported once per finished write. `error` is None on success; `skipped`
+# means the rendered bytes matched the file already on disk.
+SaveResult = namedtuple("SaveResult", ("ok", "error", "seconds", "backup_error", "skipped"))
+
+REPLACE_RETRIES = 5 # Windows refuses the rename while OBS has the file open; retry briefly
+REPLACE_RETRY_DELAY = 0.05
+
+
+def content_hash(encoded):
+    """Digest of UTF-8 bytes, used to recognise renders identical to the file on disk."""
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+def rotate_backup(path, backup_path):
+    """Makes backup_path refer to the current contents of path without copying them.
+
+    The overlay is only ever replaced by rename, so a hard link to the current
+    file keeps the old version around for free. Filesystems without hard
+    links fall back to a copy.
+    """
+    staging = backup_path + ".tmp"
+    try:
+        os.remove(staging)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, staging)
+    except FileNotFoundError:
+        return # Nothing saved yet, nothing to back up
+    except OSError:
+        shutil.copy2(path, staging)
+    os.replace(staging, backup_path)
+
+
+def write_atomic(path, text, fsync=True):
+    """Writes text to path via a temp file in the same directory and an atomic rename.
+
+    fsync=False skips flushing the data to disk, for files that are cheap to
+    rebuild if a crash loses them. Returns the os.stat_result of the file as
+    written (the rename keeps its mtime and size), so a change made to path
+    afterwards is never mistaken for this write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+            written = os.fstat(file.fileno())
+        try:
+            shutil.copymode(path, tmp_path) # mkstemp files are owner-only
+        except OSError:
+            pass
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp_path, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return written
+
+
+class OverlayWriter:
+    """Renders and writes snapshots of the standings on a background thread.
+
+    submit() never blocks: it replaces any snapshot still waiting to be
+    written. Results are put on `results` for the Tk thread to poll, since
+    Tk widgets must not be touched from the worker. after_write(snapshot,
+    stat), if given, runs on the worker after each successful write, with
+    write_atomic's os.stat_result of the new file. With a
+    concurrent.futures `pool`, writes run on the pool (which the caller shuts
+    down) instead of on a thread of the writer's own.
+    """
+
+    def __init__(self, path, backup_path=None, after_write=None, pool=None):
+        self.path = path
+        self.backup_path = backup_path
+        self.after_write = after_write
+        self.results = queue.Queue()
+        self._cond = threading.Condition()
+        self._pending = None
+        self._busy = False
+        self._closed = False
+        self._generation = None # Store generation of the last queued snapshot
+        self._last_hash = None # Hash of the file as last written (or found on disk)
+        self._hash_loaded = False
+        self._stats = {"written": 0, "skipped_clean": 0, "skipped_identical": 0, "failed": 0, "bytes_written": 0}
+        self._pool = pool
+        self._scheduled = False # A drain task is queued on or running in the pool
+        self._marks = [] # (metric name, start) waiting for the next submit()
+        self._pending_marks = [] # ... and those travelling with the pending snapshot
+        self._thread = None
+        if pool is None:
+            self._thread = threading.Thread(target=self._run, name="overlay-writer", daemon=True)
+            self._thread.start()
+
+    def save(self, renderer, store):
+        """Queues the store's current state, unless its generation was already saved.
+
+        Returns False (and counts a clean skip) when there is nothing new.
+        """
+        with self._cond:
+            if store.generation == self._generation:
+                metrics.count("saves.skipped_clean")
+                self._stats["skipped_clean"] += 1
+                return False
+        self.submit(renderer, store.snapshot(), store.generation)
+        return True
+
+    def submit(self, renderer, snapshot, generation=None):
+        """Queues snapshot (a tuple of TeamRows) to be rendered with renderer and written."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("OverlayWriter is closed")
+            self._pending = (renderer, snapshot)
+            self._generation = generation
+            self._pending_marks += self._marks
+            self._marks = []
+            self._cond.notify_all()
+            if self._pool is not None and not self._scheduled:
+                self._scheduled = True
+                self._pool.submit(self._drain)
+
+    def mark(self, name, started):
+        """Records metric `name` from `started` (a time.perf_counter()) until the next submitted snapshot is on disk.
+
+        Used for keypress-to-overlay latency; marks of a failed write are dropped.
+        """
+        with self._cond:
+            self._marks.append((name, started))
+
+    def invalidate(self):
+        """Forgets what was saved, e.g. after the template changed, so the next save() writes."""
+        with self._cond:
+            self._generation = None
+            self._last_hash = None
+            self._hash_loaded = True
+
+    def written_hash(self):
+        """content_hash of the overlay as this writer last wrote it (or is writing it), or None before its first write."""
+        with self._cond:
+            return self._last_hash
+
+    def stats(self):
+        """Returns a copy of the save counters: written, skipped_clean, skipped_identical, failed, bytes_written."""
+        with self._cond:
+            return dict(self._stats)
+
+    def flush(self, timeout=None):
+        """Waits until every submitted snapshot has been written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        """Writes whatever is still pending, then stops the worker thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        else:
+            self.flush(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return # Closed and drained
+            self._write_pending()
+
+    def _drain(self):
+        """Pool task: writes snapshots until none is pending, then frees the pool worker."""
+        while True:
+            with self._cond:
+                if self._pending is None:
+                    self._scheduled = False
+                    return
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._cond:
+            renderer, snapshot = self._pending
+            marks, self._pending_marks = self._pending_marks, []
+            self._pending = None
+            self._busy = True
+        try:
+            result = self._write(renderer, snapshot)
+            if result.ok:
+                landed = time.perf_counter()
+                for name, started in marks:
+                    metrics.record(name, landed - started)
+            self.results.put(result)
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _load_disk_hash(self):
+        """Hashes the existing overlay once, so an unchanged first save is skipped too."""
+        self._hash_loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self._last_hash = content_hash(file.read().encode("utf-8"))
+        except (OSError, UnicodeDecodeError):
+            self._last_hash = None
+
+    def _write(self, renderer, snapshot):
+        start = time.perf_counter()
+        with metrics.timer("render"):
+            text = renderer.render(snapshot)
+        encoded = text.encode("utf-8")
+        digest = content_hash(encoded)
+        if not self._hash_loaded:
+            self._load_disk_hash()
+        with self._cond:
+            if digest == self._last_hash:
+                metrics.count("saves.skipped_identical")
+                self._stats["skipped_identical"] += 1
+                return SaveResult(True, None, time.perf_counter() - start, None, True)
+
+        backup_error = None
+        if self.backup_path:
+            try:
+                rotate_backup(self.path, self.backup_path)
+            except Exception as e:
+                # Report the backup error but still attempt the save
+                backup_error = e
+        with self._cond:
+            # Recorded before the rename, so a watcher that sees the new file
+            # (see written_hash) already recognises it as our own save
+            self._last_hash = digest
+        try:
+            with metrics.timer("write"):
+                written = write_atomic(self.path, text)
+        except Exception as e:
+            with self._cond:
+                self._stats["failed"] += 1
+                self._generation = None # Let the next save() retry this state
+                self._last_hash = None
+            metrics.count("saves.failed")
+            return SaveResult(False, e, time.perf_counter() - start, backup_error, False)
+        with self._cond:
+            self._stats["written"] += 1
+            self._stats["bytes_written"] += len(encoded)
+        metrics.count("saves.written")
+        if self.after_write:
+            try:
+                self.after_write(snapshot, written)
+            except Exception as e:
+                print(f"Warning: after-save hook failed: {e}")
+        return SaveResult(True, None, time.perf_counter() - start, backup_error, False)